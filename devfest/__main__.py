@@ -2,7 +2,9 @@
 
 import click
 
+from .duplicates import duplicates
 from .process import process
+from .serve import serve
 from .validate import validate
 from .website import generate_website
 
@@ -16,6 +18,8 @@ def cli():
 cli.add_command(process)
 cli.add_command(click.command(validate))
 cli.add_command(click.command(generate_website))
+cli.add_command(click.command(duplicates))
+cli.add_command(click.command(serve))
 
 
 if __name__ == "__main__":
@@ -17,6 +17,7 @@ SCRIPT_DIR = pathlib.Path(__file__).parent.resolve()
 ROOT_DIR = SCRIPT_DIR.parent
 DATABASE_DIR = ROOT_DIR / "database"
 BUILD_DIR = ROOT_DIR / "build"
+CACHE_DIR = BUILD_DIR / "cache"
 
 
 class DataSource(StrEnum):
@@ -0,0 +1,185 @@
+"""Find companies that are likely duplicates."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Iterable
+
+import click
+
+from .models.base import load_companies
+
+# Words that do not tell companies apart, like legal forms.
+IGNORED_WORDS = {
+    "ab",
+    "ag",
+    "as",
+    "bv",
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "electronic",
+    "electronics",
+    "gmbh",
+    "group",
+    "holding",
+    "holdings",
+    "inc",
+    "incorporated",
+    "international",
+    "kg",
+    "limited",
+    "llc",
+    "ltd",
+    "nv",
+    "oy",
+    "plc",
+    "pty",
+    "sa",
+    "sas",
+    "spa",
+    "srl",
+    "tech",
+    "technologies",
+    "technology",
+}
+
+# Trigrams shared by more names than this are not used to find candidates.
+MAX_BUCKET_SIZE = 100
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a company name for comparison.
+
+    Accents, punctuation, casing and words like legal forms are dropped.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    # Keep abbreviations like "B.V." together
+    name = re.sub(r"(?<=\b\w)\.(?=\w\b)", "", name.casefold())
+    words = re.findall(r"\w+", name)
+    kept = [word for word in words if word not in IGNORED_WORDS]
+    # A name can consist of ignored words only
+    return " ".join(kept or words)
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Return the trigrams of a normalized name, ignoring spaces."""
+    compact = f"  {normalized.replace(' ', '')} "
+    return {compact[i : i + 3] for i in range(len(compact) - 2)}
+
+
+def find_duplicates(
+    names: dict[str, str], threshold: float = 0.8
+) -> list[tuple[str, str, float]]:
+    """Find likely duplicates in company names keyed by company ID.
+
+    Candidate pairs are the names that normalize the same or share a trigram
+    that is not too common, so not all pairs are compared. Returns
+    (company ID, company ID, similarity) sorted by similarity, where the
+    similarity is the Jaccard index of all trigrams of the normalized names.
+    """
+    normalized = {
+        company_id: normalize_name(name) for company_id, name in names.items()
+    }
+    grams = {
+        company_id: trigrams(company_name)
+        for company_id, company_name in normalized.items()
+    }
+
+    buckets: dict[str, list[str]] = defaultdict(list)
+    for company_id, company_grams in grams.items():
+        for gram in company_grams:
+            buckets[gram].append(company_id)
+
+    # Names that normalize the same are always candidates
+    same_names: dict[str, list[str]] = defaultdict(list)
+    for company_id, company_name in normalized.items():
+        same_names[company_name].append(company_id)
+
+    # Count the rare trigrams shared by candidate pairs. Common trigrams are
+    # skipped to avoid comparing too many pairs, so the count is a lower
+    # bound of the shared trigrams.
+    shared: dict[tuple[str, str], int] = defaultdict(int)
+    for bucket in buckets.values():
+        if len(bucket) > MAX_BUCKET_SIZE:
+            continue
+        bucket.sort()
+        for index, first in enumerate(bucket):
+            for second in bucket[index + 1 :]:
+                shared[(first, second)] += 1
+
+    for bucket in same_names.values():
+        bucket.sort()
+        for index, first in enumerate(bucket):
+            for second in bucket[index + 1 :]:
+                shared.setdefault((first, second), 0)
+
+    common = {
+        company_id: sum(len(buckets[gram]) > MAX_BUCKET_SIZE for gram in company_grams)
+        for company_id, company_grams in grams.items()
+    }
+
+    duplicates = []
+    for (first, second), count in shared.items():
+        first_grams = grams[first]
+        second_grams = grams[second]
+        # Skip pairs that can't reach the threshold, even if they share all
+        # their common trigrams.
+        upper = count + min(common[first], common[second])
+        total = len(first_grams) + len(second_grams)
+        if upper / (total - upper) < threshold:
+            continue
+        similarity = len(first_grams & second_grams) / len(first_grams | second_grams)
+        if similarity >= threshold:
+            duplicates.append((first, second, similarity))
+
+    duplicates.sort(key=lambda duplicate: (-duplicate[2], duplicate[0], duplicate[1]))
+    return duplicates
+
+
+def group_duplicates(duplicates: Iterable[tuple[str, str, float]]) -> list[list[str]]:
+    """Group duplicate pairs into sets of companies."""
+    parents: dict[str, str] = {}
+
+    def find(company_id: str) -> str:
+        parents.setdefault(company_id, company_id)
+        while parents[company_id] != company_id:
+            parents[company_id] = parents[parents[company_id]]
+            company_id = parents[company_id]
+        return company_id
+
+    for first, second, _ in duplicates:
+        parents[find(first)] = find(second)
+
+    groups: dict[str, list[str]] = defaultdict(list)
+    for company_id in parents:
+        groups[find(company_id)].append(company_id)
+    return sorted(sorted(group) for group in groups.values())
+
+
+@click.option(
+    "--threshold",
+    default=0.8,
+    show_default=True,
+    help="Minimum similarity of the normalized names.",
+)
+def duplicates(threshold: float = 0.8):
+    """Report companies that are likely duplicates."""
+    names = {company.id: company.name for company in load_companies()}
+    found = find_duplicates(names, threshold)
+
+    if not found:
+        print("No duplicates found")
+        return
+
+    for first, second, similarity in found:
+        print(f"{similarity:.2f} {first} ({names[first]}) - {second} ({names[second]})")
+
+    print()
+    print("Groups:")
+    for group in group_duplicates(found):
+        print(", ".join(group))
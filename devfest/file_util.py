@@ -0,0 +1,39 @@
+"""File helpers."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+from typing import Any, Callable
+
+
+def mtime_or_none(path: str | os.PathLike) -> int | None:
+    """Return the modification time of a path, None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def write_text_atomic(path: pathlib.Path, content: str) -> None:
+    """Write text to a file by replacing it."""
+    _write_atomic(path, lambda tmp_path: tmp_path.write_text(content))
+
+
+def write_bytes_atomic(path: pathlib.Path, content: bytes) -> None:
+    """Write bytes to a file by replacing it."""
+    _write_atomic(path, lambda tmp_path: tmp_path.write_bytes(content))
+
+
+def _write_atomic(path: pathlib.Path, write: Callable[[pathlib.Path], Any]) -> None:
+    """Write a temporary file next to a file and replace the file with it.
+
+    An interrupted write never leaves a partial file behind.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
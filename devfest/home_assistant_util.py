@@ -1,7 +1,148 @@
-"""Utility functions for Home Assistant."""
+"""Utility functions for Home Assistant.
+
+Integrations info is fetched from the Home Assistant website and cached in
+the build cache, revalidated with its ETag once it is older than
+INTEGRATIONS_MAX_AGE. In offline mode, or with DEVFEST_OFFLINE set, the
+vendored snapshot at INTEGRATIONS_SNAPSHOT is used instead; update it with
+update_integrations_snapshot(). IntegrationsUnavailable is raised when there
+is no snapshot offline, or the info can't be fetched and is not cached.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+from typing import Any
 
 import httpx
 
+from .const import CACHE_DIR, SCRIPT_DIR
+from .file_util import write_text_atomic
+
+INTEGRATIONS_URL = "https://www.home-assistant.io/integrations.json"
+INTEGRATIONS_CACHE = CACHE_DIR / "integrations.json"
+INTEGRATIONS_CACHE_META = CACHE_DIR / "integrations.meta.json"
+INTEGRATIONS_SNAPSHOT = SCRIPT_DIR / "data" / "integrations.json"
+INTEGRATIONS_MAX_AGE = 24 * 60 * 60
+INTEGRATIONS_TIMEOUT = 10
+
+
+class IntegrationsUnavailable(Exception):
+    """The integrations info can't be loaded."""
+
+
+class IntegrationsInfo:
+    """Integrations info indexed by domain."""
+
+    def __init__(self, payload: Any) -> None:
+        self.payload = payload
+        if isinstance(payload, dict):
+            self.domains: dict[str, dict] = dict(payload)
+        else:
+            self.domains = {info["domain"]: info for info in payload}
+        self.iot_classes: dict[str, str | None] = {
+            domain: info.get("iot_class") for domain, info in self.domains.items()
+        }
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.domains
+
+    def get(self, domain: str) -> dict | None:
+        """Return the info of an integration."""
+        return self.domains.get(domain)
+
+    def iot_class(self, domain: str) -> str | None:
+        """Return the IoT class of an integration."""
+        return self.iot_classes.get(domain)
+
+
+def integrations_info(offline: bool | None = None) -> IntegrationsInfo:
+    """Return the integrations info.
+
+    Repeated calls are served from memory.
+    """
+    if offline is None:
+        offline = bool(os.environ.get("DEVFEST_OFFLINE"))
+    return _integrations_info(offline)
+
+
+@functools.lru_cache(maxsize=None)
+def _integrations_info(offline: bool) -> IntegrationsInfo:
+    """Load the integrations info."""
+    if offline:
+        return IntegrationsInfo(_load_snapshot())
+    return IntegrationsInfo(_load_cached())
+
+
+def update_integrations_snapshot() -> None:
+    """Update the vendored snapshot from the website."""
+    INTEGRATIONS_SNAPSHOT.parent.mkdir(parents=True, exist_ok=True)
+    payload = _load_cached()
+    write_text_atomic(
+        INTEGRATIONS_SNAPSHOT, json.dumps(payload, indent=2, sort_keys=True)
+    )
+    _integrations_info.cache_clear()
+
+
+def _load_snapshot() -> Any:
+    """Load the vendored snapshot, or the cache if there is no snapshot."""
+    for path in (INTEGRATIONS_SNAPSHOT, INTEGRATIONS_CACHE):
+        if path.exists():
+            return json.loads(path.read_text())
+    raise IntegrationsUnavailable(
+        f"No integrations snapshot at {INTEGRATIONS_SNAPSHOT}, "
+        "run update_integrations_snapshot() with network access"
+    )
+
+
+def _load_cached() -> Any:
+    """Load the cached payload, fetching it if it is missing or too old."""
+    try:
+        meta = json.loads(INTEGRATIONS_CACHE_META.read_text())
+        payload = json.loads(INTEGRATIONS_CACHE.read_text())
+    except (FileNotFoundError, ValueError):
+        meta = {}
+        payload = None
+
+    if (
+        payload is not None
+        and time.time() - meta.get("fetched", 0) < INTEGRATIONS_MAX_AGE
+    ):
+        return payload
+
+    headers = {}
+    if payload is not None and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+
+    try:
+        response = httpx.get(
+            INTEGRATIONS_URL, headers=headers, timeout=INTEGRATIONS_TIMEOUT
+        )
+        # raise_for_status raises on a 304 Not Modified too
+        if response.status_code != 304:
+            response.raise_for_status()
+    except httpx.HTTPError as err:
+        # Use a stale cache rather than failing
+        if payload is not None:
+            return payload
+        raise IntegrationsUnavailable(
+            f"Unable to fetch {INTEGRATIONS_URL}: {err}"
+        ) from err
+
+    INTEGRATIONS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    if response.status_code != 304:
+        payload = response.json()
+        write_text_atomic(INTEGRATIONS_CACHE, response.text)
 
-def integrations_info():
-    return httpx.get("https://www.home-assistant.io/integrations.json").json()
+    write_text_atomic(
+        INTEGRATIONS_CACHE_META,
+        json.dumps(
+            {
+                "etag": response.headers.get("etag", meta.get("etag")),
+                "fetched": time.time(),
+            }
+        ),
+    )
+    return payload
@@ -2,44 +2,76 @@
 
 from __future__ import annotations
 
-import dataclasses
+import os
 import pathlib
-from functools import cached_property
-
-import yaml
+import sys
+from typing import Collection
 
 from ..const import DATABASE_DIR
+from .cache import load_yaml
+
 
+def load_companies(company_ids: Collection[str] | None = None) -> list[Company]:
+    """Load companies indexed by source identifier.
 
-def load_companies() -> list[Company]:
-    """Load companies indexed by source identifier."""
+    Pass company IDs to only load those companies. Only the directories are
+    listed, company data is read on first access.
+    """
     companies = []
     for company_dir in DATABASE_DIR.iterdir():
-        companies.append(
-            Company(
-                path=company_dir,
-                info=yaml.safe_load((company_dir / "info.yaml").read_text()),
-                is_new=False,
-            )
-        )
+        if company_ids is not None and company_dir.name not in company_ids:
+            continue
+        companies.append(Company(company_dir.name, is_new=False))
 
     return companies
 
 
-@dataclasses.dataclass
+def list_subdirs(path: pathlib.Path) -> frozenset[str]:
+    """Return the names of the subdirectories of a path."""
+    return frozenset(
+        sys.intern(entry.name) for entry in os.scandir(path) if entry.is_dir()
+    )
+
+
 class Company:
-    path: pathlib.Path
-    info: dict
-    subdirs: list[str] = dataclasses.field(init=False)
-    is_new: bool = dataclasses.field(default=True)
+    """A company in the database.
+
+    Only the ID is stored, paths are derived from the database directory.
+    The info and devices are read on first access.
+    """
+
+    __slots__ = ("id", "is_new", "_info", "_subdirs", "_devices")
+
+    def __init__(
+        self, company_id: str, info: dict | None = None, is_new: bool = True
+    ) -> None:
+        self.id = sys.intern(company_id)
+        self.is_new = is_new
+        self._info = info
+        self._subdirs: frozenset[str] | None = None
+        self._devices: list[Device] | None = None
+
+    def __repr__(self) -> str:
+        return f"Company(id={self.id!r}, is_new={self.is_new!r})"
 
-    def __post_init__(self) -> None:
-        self.subdirs = [entry.name for entry in self.path.iterdir() if entry.is_dir()]
+    @property
+    def path(self) -> pathlib.Path:
+        """Path of the company."""
+        return DATABASE_DIR / self.id
+
+    @property
+    def info(self) -> dict:
+        """Info of the company."""
+        if self._info is None:
+            self._info = load_yaml(self.path / "info.yaml")
+        return self._info
 
     @property
-    def id(self) -> str:
-        """ID of the company."""
-        return self.path.name
+    def subdirs(self) -> frozenset[str]:
+        """Return the names of the subdirectories."""
+        if self._subdirs is None:
+            self._subdirs = list_subdirs(self.path)
+        return self._subdirs
 
     @property
     def name(self) -> str:
@@ -50,36 +82,60 @@ class Company:
     def devices_dir(self) -> pathlib.Path:
         return self.path / "devices"
 
-    @cached_property
+    @property
     def devices(self) -> list[Device]:
         """Return the devices of this company."""
-        devices = []
-        for device_dir in self.devices_dir.iterdir():
-            devices.append(
-                Device(
-                    path=device_dir,
-                    info=yaml.safe_load((device_dir / "info.yaml").read_text()),
-                    is_new=False,
-                )
-            )
+        if self._devices is None:
+            self._devices = [
+                Device(self.id, entry.name, is_new=False)
+                for entry in os.scandir(self.devices_dir)
+            ]
+        return self._devices
 
-        return devices
 
-
-@dataclasses.dataclass
 class Device:
-    path: pathlib.Path
-    info: dict
-    subdirs: list[str] = dataclasses.field(init=False)
-    is_new: bool = dataclasses.field(default=True)
+    """A device in the database.
+
+    Only the IDs are stored, paths are derived from the database directory.
+    The info is read on first access.
+    """
+
+    __slots__ = ("company_id", "id", "is_new", "_info", "_subdirs")
+
+    def __init__(
+        self,
+        company_id: str,
+        device_id: str,
+        info: dict | None = None,
+        is_new: bool = True,
+    ) -> None:
+        self.company_id = sys.intern(company_id)
+        self.id = device_id
+        self.is_new = is_new
+        self._info = info
+        self._subdirs: frozenset[str] | None = None
+
+    def __repr__(self) -> str:
+        return f"Device(company_id={self.company_id!r}, id={self.id!r}, is_new={self.is_new!r})"
+
+    @property
+    def path(self) -> pathlib.Path:
+        """Path of the device."""
+        return DATABASE_DIR / self.company_id / "devices" / self.id
 
-    def __post_init__(self) -> None:
-        self.subdirs = [entry.name for entry in self.path.iterdir() if entry.is_dir()]
+    @property
+    def info(self) -> dict:
+        """Info of the device."""
+        if self._info is None:
+            self._info = load_yaml(self.path / "info.yaml")
+        return self._info
 
     @property
-    def id(self) -> str:
-        """ID of the company."""
-        return self.path.name
+    def subdirs(self) -> frozenset[str]:
+        """Return the names of the subdirectories."""
+        if self._subdirs is None:
+            self._subdirs = list_subdirs(self.path)
+        return self._subdirs
 
     @property
     def model_name(self) -> str:
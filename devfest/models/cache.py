@@ -0,0 +1,143 @@
+"""Persistent cache of parsed database files."""
+
+from __future__ import annotations
+
+import atexit
+import os
+import pathlib
+import pickle
+import sys
+from typing import Any
+
+from .. import yaml_util
+from ..const import CACHE_DIR
+from ..file_util import write_bytes_atomic
+
+# Bump when the format of the cached data changes.
+CACHE_VERSION = 1
+CACHE_PATH = CACHE_DIR / "database.pickle"
+
+# Keys whose values repeat across many files
+INTERNED_VALUE_KEYS = {"integration", "manufacturer"}
+
+
+class FileCache:
+    """Cache of parsed YAML files, keyed by path and invalidated by mtime and size.
+
+    Entries hold the pickled parsed data so every read returns a fresh copy
+    that callers are free to modify.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.entries: dict[str, tuple[int, int, bytes]] | None = None
+        self.seen: set[str] = set()
+        # Entries parsed since they were last taken with take_updated
+        self.updated: dict[str, tuple[int, int, bytes]] = {}
+        self.dirty = False
+
+    def load(self) -> None:
+        """Load the cache from disk."""
+        self.entries = {}
+        try:
+            with self.path.open("rb") as fp:
+                version, entries = pickle.load(fp)
+        except FileNotFoundError:
+            return
+        except Exception as err:
+            print(f"Ignoring unreadable cache {self.path}: {err}")
+            return
+
+        if version == CACHE_VERSION:
+            self.entries = entries
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self.dirty:
+            return
+
+        # Drop entries of files that have been removed.
+        entries = {
+            key: entry
+            for key, entry in self.entries.items()
+            if key in self.seen or os.path.exists(key)
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomic(
+            self.path, pickle.dumps((CACHE_VERSION, entries), pickle.HIGHEST_PROTOCOL)
+        )
+        self.dirty = False
+
+    def take_updated(self) -> dict[str, tuple[int, int, bytes]]:
+        """Return the entries parsed since the last call and forget them.
+
+        Worker processes never save the cache, they pass these entries to
+        the main process instead.
+        """
+        updated, self.updated = self.updated, {}
+        return updated
+
+    def merge(self, entries: dict[str, tuple[int, int, bytes]]) -> None:
+        """Add entries parsed by another process."""
+        if not entries:
+            return
+        if self.entries is None:
+            self.load()
+            atexit.register(self.save)
+        self.entries.update(entries)
+        self.seen.update(entries)
+        self.dirty = True
+
+    def load_yaml(self, path: pathlib.Path) -> Any:
+        """Return the parsed content of a YAML file."""
+        if self.entries is None:
+            self.load()
+            atexit.register(self.save)
+
+        key = str(path)
+        stat = path.stat()
+        self.seen.add(key)
+
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry[0] == stat.st_mtime_ns
+            and entry[1] == stat.st_size
+        ):
+            return pickle.loads(entry[2])
+
+        data = yaml_util.load_yaml(path)
+        entry = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            pickle.dumps(data, pickle.HIGHEST_PROTOCOL),
+        )
+        self.entries[key] = entry
+        self.updated[key] = entry
+        self.dirty = True
+        return data
+
+
+DATABASE_CACHE = FileCache(CACHE_PATH)
+
+
+def load_yaml(path: pathlib.Path) -> Any:
+    """Return the parsed content of a YAML file in the database."""
+    return intern_strings(DATABASE_CACHE.load_yaml(path))
+
+
+def intern_strings(data: Any) -> Any:
+    """Intern dictionary keys and values that repeat across files."""
+    if isinstance(data, dict):
+        return {
+            (sys.intern(key) if isinstance(key, str) else key): (
+                sys.intern(value)
+                if key in INTERNED_VALUE_KEYS and isinstance(value, str)
+                else intern_strings(value)
+            )
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [intern_strings(value) for value in data]
+    return data
@@ -1,23 +1,62 @@
 from __future__ import annotations
-import dataclasses
 import pathlib
 
-import yaml
-
 from ..const import DataSource
 from .base import Company, Device, load_companies
+from .cache import load_yaml
+
+
+def _version_key(version: dict) -> tuple[tuple[str, str], ...]:
+    """Return a hashable key for a version."""
+    return tuple(sorted(version.items()))
 
 
-@dataclasses.dataclass
 class HADevice:
-    device: Device
-    ha_info: dict = dataclasses.field(init=False)
-    ha_versions: dict = dataclasses.field(init=False)
+    """Home Assistant view of a device.
+
+    The Home Assistant files are read on first access.
+    """
+
+    __slots__ = ("device", "_ha_info", "_ha_versions", "_version_index")
+
+    def __init__(self, device: Device) -> None:
+        self.device = device
+        self._ha_info: dict | None = None
+        self._ha_versions: dict | None = None
+        self._version_index: set[tuple[tuple[str, str], ...]] | None = None
 
-    def __post_init__(self) -> None:
-        """Post initialization."""
-        self.ha_info = yaml.safe_load(self.ha_info_path.read_text())
-        self.ha_versions = yaml.safe_load(self.ha_versions_path.read_text())
+    def __repr__(self) -> str:
+        return f"HADevice(device={self.device!r})"
+
+    @property
+    def ha_info(self) -> dict:
+        """Return the Home Assistant info."""
+        if self._ha_info is None:
+            self._ha_info = load_yaml(self.ha_info_path)
+        return self._ha_info
+
+    @property
+    def ha_versions(self) -> dict:
+        """Return the versions seen by Home Assistant."""
+        if self._ha_versions is None:
+            self._ha_versions = load_yaml(self.ha_versions_path)
+        return self._ha_versions
+
+    def add_version(self, version: dict) -> bool:
+        """Append a version if it was not seen yet.
+
+        Returns whether the version was added.
+        """
+        if self._version_index is None:
+            self._version_index = {
+                _version_key(seen) for seen in self.ha_versions["versions"]
+            }
+        key = _version_key(version)
+        if key in self._version_index:
+            return False
+        self._version_index.add(key)
+        self.ha_versions["versions"].append(version)
+        return True
 
     @property
     def id(self) -> str:
@@ -29,6 +68,18 @@ class HADevice:
         """Return name of the device."""
         return self.device.model_name
 
+    @property
+    def keys(self) -> list[tuple[str, str, str]]:
+        """Return the integration keys of the device."""
+        return [
+            (
+                integration["integration"],
+                integration["manufacturer"],
+                integration["model_id"],
+            )
+            for integration in self.ha_info["integrations"]
+        ]
+
     @property
     def ha_info_path(self) -> pathlib.Path:
         """Return path to HA info."""
@@ -40,38 +91,85 @@ class HADevice:
         return self.device.path / DataSource.HOME_ASSISTANT / "versions.yaml"
 
 
-@dataclasses.dataclass
 class HACompany:
-    company: Company
-    ha_info: dict = dataclasses.field(init=False)
-    devices_no_ha_data: list[Device] = dataclasses.field(
-        init=False, default_factory=list
-    )
-    devices: dict[tuple[str, str, str], HADevice] = dataclasses.field(
-        init=False, default_factory=dict
+    """Home Assistant view of a company.
+
+    The Home Assistant info is read and the devices are indexed on first
+    access.
+    """
+
+    __slots__ = (
+        "company",
+        "_ha_info",
+        "_ha_devices",
+        "_devices",
+        "_key_conflicts",
     )
 
-    def __post_init__(self) -> None:
-        """Post init the HA Company."""
-        self.ha_info = yaml.safe_load(self.ha_info_path.read_text())
+    def __init__(self, company: Company) -> None:
+        self.company = company
+        self._ha_info: dict | None = None
+        self._ha_devices: list[HADevice] | None = None
+        self._devices: dict[tuple[str, str, str], HADevice] | None = None
+        self._key_conflicts: dict[tuple[str, str, str], list[HADevice]] | None = None
 
-        # Index devices
-        for device in self.company.devices:
-            if DataSource.HOME_ASSISTANT not in device.subdirs:
-                self.devices_no_ha_data.append(device)
-                continue
+    def __repr__(self) -> str:
+        return f"HACompany(company={self.company!r})"
+
+    @property
+    def ha_info(self) -> dict:
+        """Return the Home Assistant info."""
+        if self._ha_info is None:
+            self._ha_info = load_yaml(self.ha_info_path)
+        return self._ha_info
+
+    @property
+    def ha_devices(self) -> list[HADevice]:
+        """Return the devices with Home Assistant data."""
+        if self._ha_devices is None:
+            self._ha_devices = [
+                HADevice(device)
+                for device in self.company.devices
+                if DataSource.HOME_ASSISTANT in device.subdirs
+            ]
+        return self._ha_devices
 
-            ha_device = HADevice(device)
+    @property
+    def devices_no_ha_data(self) -> list[Device]:
+        """Return the devices without Home Assistant data."""
+        return [
+            device
+            for device in self.company.devices
+            if DataSource.HOME_ASSISTANT not in device.subdirs
+        ]
+
+    @property
+    def devices(self) -> dict[tuple[str, str, str], HADevice]:
+        """Return the devices indexed by integration key."""
+        if self._devices is None:
+            self._devices = {}
+            for ha_device in self.ha_devices:
+                for key in ha_device.keys:
+                    self._devices[key] = ha_device
+        return self._devices
 
-            # Index the device
-            for integration in ha_device.ha_info["integrations"]:
-                self.devices[
-                    (
-                        integration["integration"],
-                        integration["manufacturer"],
-                        integration["model_id"],
-                    )
-                ] = ha_device
+    @property
+    def key_conflicts(self) -> dict[tuple[str, str, str], list[HADevice]]:
+        """Return keys claimed by more than one device.
+
+        The last device wins in the index.
+        """
+        if self._key_conflicts is None:
+            claims: dict[tuple[str, str, str], list[HADevice]] = {}
+            for ha_device in self.ha_devices:
+                for key in ha_device.keys:
+                    claimed_by = claims.setdefault(key, [])
+                    if ha_device not in claimed_by:
+                        claimed_by.append(ha_device)
+            self._key_conflicts = {
+                key: devices for key, devices in claims.items() if len(devices) > 1
+            }
+        return self._key_conflicts
 
     @property
     def id(self) -> str:
@@ -90,8 +188,16 @@ class HACompany:
 
 
 class HADeviceIndex:
+    """Index of all companies with their Home Assistant view.
+
+    This is the single load pass shared by processing, validation and the
+    website. Every company is loaded once, devices are loaded on first use.
+    """
+
     def __init__(self) -> None:
-        self.no_ha_data: dict[str, Company] = {}
+        self.all_companies: list[HACompany] = []
+        self.by_id: dict[str, HACompany] = {}
+        self.no_ha_data: dict[str, HACompany] = {}
         self.companies: dict[tuple[str, str], HACompany] = {}
 
     def load(self) -> None:
@@ -100,9 +206,11 @@ class HADeviceIndex:
 
         for company in companies:
             ha_company = HACompany(company)
+            self.all_companies.append(ha_company)
+            self.by_id[company.id] = ha_company
 
             if not ha_company.ha_info["integrations"]:
-                self.no_ha_data[company.id] = company
+                self.no_ha_data[company.id] = ha_company
                 continue
 
             # Index the company
@@ -0,0 +1,206 @@
+"""Persistent index of company names and device model IDs."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import pathlib
+
+from slugify import slugify
+
+from ..const import CACHE_DIR, DATABASE_DIR
+from ..file_util import mtime_or_none, write_text_atomic
+from .base import Company, Device
+from .cache import load_yaml
+
+# Bump when the format of the index changes.
+INDEX_VERSION = 1
+INDEX_PATH = CACHE_DIR / "name-index.json"
+
+
+class NameIndex:
+    """Index of companies by name and of devices by model ID.
+
+    Companies are found by their casefolded name or the slug of their name,
+    devices by their model ID. The index is stored in the build cache.
+    Company entries are brought up to date on first use, the devices of a
+    company when they are first looked up: only entries whose info file or
+    devices directory changed are read again.
+    """
+
+    def __init__(self, path: pathlib.Path = INDEX_PATH) -> None:
+        self.path = path
+        # company ID => company entry as stored
+        self.entries: dict[str, dict] | None = None
+        self.names: dict[str, str] = {}
+        self.slugs: dict[str, str] = {}
+        # Model IDs of the companies whose devices are up to date
+        self.model_ids: dict[str, dict[str, str]] = {}
+        self.dirty = False
+
+    def load(self) -> None:
+        """Load the index and update the companies with the database."""
+        try:
+            version, entries = json.loads(self.path.read_text())
+        except (FileNotFoundError, TypeError, ValueError):
+            version, entries = None, {}
+        if version != INDEX_VERSION:
+            entries = {}
+
+        self.entries = {}
+        for company_dir in os.scandir(DATABASE_DIR):
+            if not company_dir.is_dir():
+                continue
+            entry = entries.get(company_dir.name)
+            updated = self._update_company(company_dir.name, entry)
+            self.dirty |= updated is not entry
+            self.entries[company_dir.name] = updated
+
+        self.dirty |= entries.keys() != self.entries.keys()
+
+        for company_id in self.entries:
+            self._index_company(company_id)
+
+        atexit.register(self.save)
+
+    def save(self) -> None:
+        """Write the index to disk if it changed."""
+        if not self.dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.path, json.dumps([INDEX_VERSION, self.entries]))
+        self.dirty = False
+
+    def find_company(self, name: str) -> str | None:
+        """Return the ID of the company with a name, ignoring case."""
+        if self.entries is None:
+            self.load()
+        return self.names.get(name.casefold())
+
+    def find_company_slug(self, name: str) -> str | None:
+        """Return the ID of the company whose name has the same slug."""
+        if self.entries is None:
+            self.load()
+        return self.slugs.get(slugify(name))
+
+    def find_device(self, company_id: str, model_id: str) -> str | None:
+        """Return the ID of the device of a company with a model ID."""
+        if self.entries is None:
+            self.load()
+        if company_id not in self.entries:
+            return None
+        return self._company_model_ids(company_id).get(model_id)
+
+    def add_company(self, company: Company) -> None:
+        """Add a created company."""
+        if self.entries is None:
+            self.load()
+        self.entries[company.id] = self._update_company(company.id, None)
+        self._index_company(company.id)
+        self._company_model_ids(company.id)
+        self.dirty = True
+
+    def add_device(self, device: Device) -> None:
+        """Add a created device."""
+        if self.entries is None:
+            self.load()
+        model_ids = self._company_model_ids(device.company_id)
+        entry = self.entries[device.company_id]
+        entry["devices_mtime"] = mtime_or_none(
+            DATABASE_DIR / device.company_id / "devices"
+        )
+        entry["devices"][device.id] = [
+            mtime_or_none(device.path / "info.yaml"),
+            device.model_id,
+        ]
+        model_ids[device.model_id] = device.id
+        self.dirty = True
+
+    def _company_model_ids(self, company_id: str) -> dict[str, str]:
+        """Return the device IDs of a company by model ID.
+
+        The devices of the company are brought up to date on first use.
+        """
+        model_ids = self.model_ids.get(company_id)
+        if model_ids is not None:
+            return model_ids
+
+        entry = self.entries[company_id]
+        updated = self._update_devices(company_id, entry)
+        if updated is not entry:
+            self.entries[company_id] = updated
+            self.dirty = True
+
+        model_ids = self.model_ids[company_id] = {
+            model_id: device_id
+            for device_id, (_, model_id) in updated["devices"].items()
+        }
+        return model_ids
+
+    def _update_company(self, company_id: str, entry: dict | None) -> dict:
+        """Return the entry of a company, with its name read again if it changed.
+
+        The entry is returned as-is if nothing changed.
+        """
+        info_path = DATABASE_DIR / company_id / "info.yaml"
+        info_mtime = mtime_or_none(info_path)
+
+        if entry is None:
+            entry = {"info_mtime": None, "devices_mtime": None, "devices": {}}
+
+        if entry["info_mtime"] == info_mtime:
+            return entry
+
+        return {
+            **entry,
+            "info_mtime": info_mtime,
+            "name": load_yaml(info_path)["name"],
+        }
+
+    def _update_devices(self, company_id: str, entry: dict) -> dict:
+        """Return the entry of a company, with changed devices read again.
+
+        The entry is returned as-is if nothing changed.
+        """
+        devices_path = DATABASE_DIR / company_id / "devices"
+        devices_mtime = mtime_or_none(devices_path)
+
+        if entry["devices_mtime"] == devices_mtime:
+            device_ids = list(entry["devices"])
+        elif devices_mtime is None:
+            device_ids = []
+        else:
+            device_ids = [
+                device_dir.name
+                for device_dir in os.scandir(devices_path)
+                if device_dir.is_dir()
+            ]
+
+        devices = {}
+        for device_id in device_ids:
+            device_info_path = devices_path / device_id / "info.yaml"
+            device_mtime = mtime_or_none(device_info_path)
+            device_entry = entry["devices"].get(device_id)
+            if device_entry is None or device_entry[0] != device_mtime:
+                device_entry = [
+                    device_mtime,
+                    load_yaml(device_info_path)["model_id"],
+                ]
+            devices[device_id] = device_entry
+
+        if entry["devices_mtime"] == devices_mtime and devices == entry["devices"]:
+            return entry
+
+        return {**entry, "devices_mtime": devices_mtime, "devices": devices}
+
+    def _index_company(self, company_id: str) -> None:
+        """Add a company to the name lookups."""
+        entry = self.entries[company_id]
+        self.names.setdefault(entry["name"].casefold(), company_id)
+        self.slugs.setdefault(company_id, company_id)
+        self.slugs.setdefault(slugify(entry["name"]), company_id)
+
+
+NAME_INDEX = NameIndex()
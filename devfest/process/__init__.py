@@ -2,7 +2,8 @@
 from __future__ import annotations
 import click
 
-from ..models.base import Company, load_companies
+from ..models.base import Company
+from ..models.name_index import NAME_INDEX
 from . import home_assistant
 from .base import create_company_entry, create_device_entry
 
@@ -19,25 +20,27 @@ def process():
 @click.option("--model-name", help="The model name.")
 def base(company_name: str, model_id: str, model_name: str | None):
     """Process a file from the command line."""
-    companies = load_companies()
-    found: Company | None = None
-    lower_company_name = company_name.lower()
-
-    for company in companies:
-        if company.name.lower() == lower_company_name:
-            found = company
-            break
+    found = find_company(company_name)
 
     if not found:
         found = create_company_entry(company_name)
 
-    for device in found.devices:
-        if device.info["model_id"] == model_id:
-            print(f"Device {model_id} already exists for {company_name}")
-            return
+    if NAME_INDEX.find_device(found.id, model_id):
+        print(f"Device {model_id} already exists for {company_name}")
+        return
 
     create_device_entry(found, model_id, model_name or model_id)
 
 
+def find_company(company_name: str) -> Company | None:
+    """Find a company by name, ignoring case, or by the slug of its name."""
+    company_id = NAME_INDEX.find_company(company_name) or NAME_INDEX.find_company_slug(
+        company_name
+    )
+    if company_id is None:
+        return None
+    return Company(company_id, is_new=False)
+
+
 process.add_command(base)
 process.add_command(click.command(home_assistant.process), "home-assistant")
@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import shutil
 
-import yaml
 from slugify import slugify
 
 from ..const import DATABASE_DIR
 from ..models.base import Company, Device
+from ..models.name_index import NAME_INDEX
+from ..yaml_util import load_yaml, write_yaml
 from .const import TEMPLATE_DIR
 
 
@@ -22,14 +23,17 @@ def create_company_entry(name: str) -> Company:
     (company_dir / "devices").mkdir()
 
     info_path = company_dir / "info.yaml"
-    info = yaml.safe_load(info_path.read_text())
+    info = load_yaml(info_path)
     info["name"] = name
-    info_path.write_text(yaml.dump(info))
+    write_yaml(info_path, info)
 
-    return Company(
-        path=company_dir,
+    company = Company(
+        company_dir.name,
         info=info,
     )
+    NAME_INDEX.add_company(company)
+
+    return company
 
 
 def create_device_entry(
@@ -43,15 +47,17 @@ def create_device_entry(
     shutil.copytree((TEMPLATE_DIR / "device"), device_dir)
 
     info_path = device_dir / "info.yaml"
-    info = yaml.safe_load(info_path.read_text())
+    info = load_yaml(info_path)
     info["model_id"] = model_id
     info["model_name"] = model_name
-    info_path.write_text(yaml.dump(info))
+    write_yaml(info_path, info)
 
     device = Device(
-        path=device_dir,
+        company.id,
+        device_dir.name,
         info=info,
     )
     company.devices.append(device)
+    NAME_INDEX.add_device(device)
 
     return device
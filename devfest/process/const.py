@@ -7,4 +7,21 @@ from ..const import ROOT_DIR
 PROCESS_DIR = pathlib.Path(__file__).parent.resolve()
 
 TEMPLATE_DIR = PROCESS_DIR / "templates"
+MATTER_MODELS_FILE = PROCESS_DIR / "data" / "matter_models.csv"
 PROCESS_DIR = ROOT_DIR / "to_process"
+DEFERRED_DIR = PROCESS_DIR / "deferred"
+
+# Columns of the CSV generated by the template in the README.
+CSV_COLUMNS = [
+    "integration",
+    "manufacturer",
+    "model_id",
+    "model_name",
+    "sw_version",
+    "hw_version",
+    "via_device",
+    "has_suggested_area",
+    "has_configuration_url",
+    "entry_type",
+    "is_via_device",
+]
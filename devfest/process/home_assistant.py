@@ -1,96 +1,183 @@
+from __future__ import annotations
+
 import base64
 import csv
 import json
 import pathlib
 from pprint import pprint
+from typing import Iterable, Iterator
 
-from slugify import slugify
+import click
 import voluptuous as vol
-import yaml
 
-from ..const import DataSource
 from ..models.home_assistant import HACompany, HADevice, HADeviceIndex
+from ..models.name_index import NAME_INDEX
 from ..models.update_record import UpdateRecord
 from ..validation import bool, str_or_none
 from .base import create_company_entry, create_device_entry
-from .const import PROCESS_DIR
+from .const import CSV_COLUMNS, PROCESS_DIR
+from .matter import (
+    MATTER_RESOLVERS,
+    InteractiveMatterResolver,
+    MatterResolver,
+)
+from .write_buffer import WriteBuffer
 
 IGNORED_INTEGRATIONS = {
     "wled",  # hardcoded to single value
 }
 
+DEVICE_SCHEMA = vol.Schema(
+    {
+        vol.Required("integration"): str,
+        vol.Required("manufacturer"): str,
+        vol.Required("model_id"): str,
+        vol.Required("model"): str,
+        vol.Required("sw_version"): str_or_none,
+        vol.Required("hw_version"): str_or_none,
+        vol.Required("has_suggested_area"): bool,
+        vol.Required("has_configuration_url"): bool,
+    }
+)
+
 VERSION_1_SCHEMA = vol.Schema(
     {
         vol.Required("version"): "home-assistant:1",
         vol.Required("no_model_id"): [str],
         vol.Required("devices"): [
-            {
-                vol.Required("integration"): str,
-                vol.Required("manufacturer"): str,
-                vol.Required("model_id"): str,
-                vol.Required("model"): str,
-                vol.Required("sw_version"): str_or_none,
-                vol.Required("hw_version"): str_or_none,
-                vol.Required("has_suggested_area"): bool,
-                vol.Required("has_configuration_url"): bool,
-                vol.Required("via_device"): vol.Any(None, int),
-            }
+            DEVICE_SCHEMA.extend(
+                {
+                    vol.Required("via_device"): vol.Any(None, int),
+                }
+            )
         ],
     }
 )
 
+CSV_ROW_SCHEMA = DEVICE_SCHEMA.extend(
+    {
+        # The template writes None for devices without a model
+        vol.Required("model"): str_or_none,
+        vol.Required("via_device"): vol.Any(None, dict),
+        vol.Required("entry_type"): str_or_none,
+        vol.Required("is_via_device"): bool,
+    }
+)
+
 
-def process():
+@click.option(
+    "--checkpoint",
+    type=int,
+    default=0,
+    help="Write changed files every N processed rows instead of only at the end.",
+)
+@click.option(
+    "--dedup/--no-dedup",
+    default=True,
+    help="Collapse identical rows across all files before processing them.",
+)
+@click.option(
+    "--matter",
+    type=click.Choice(list(MATTER_RESOLVERS)),
+    default="interactive",
+    help="Ask for the model ID of unknown Matter devices, or defer them for review.",
+)
+def process(checkpoint: int = 0, dedup: bool = True, matter: str = "interactive"):
     """Process Home Assistant generated files."""
     total = UpdateRecord()
+    buffer = WriteBuffer(checkpoint)
+    matter_resolver = MATTER_RESOLVERS[matter]()
 
-    for path in PROCESS_DIR.glob("*.json"):
-        print(f"{path}: ", end="")
-        try:
-            total += process_file(path)
-        except Exception as err:
-            raise err
-            print(f"Error; {err}")
-        else:
-            print("Done")
+    # The index is loaded once and kept up to date in memory as companies
+    # and devices are created, so every file is processed against it.
+    index = HADeviceIndex()
+    index.load()
+
+    paths = sorted([*PROCESS_DIR.glob("*.json"), *PROCESS_DIR.glob("*.csv")])
+
+    if dedup:
+        rows, read = dedup_rows(paths)
+        if rows:
+            print(
+                f"Read {read} rows, {len(rows)} unique ({read / len(rows):.1f}x collapse)"
+            )
+        total += process_rows(rows, index, buffer, matter_resolver)
+    else:
+        for path in paths:
+            print(f"{path}: ", end="")
+            try:
+                if path.suffix == ".csv":
+                    total += process_csv_file(path, index, buffer, matter_resolver)
+                else:
+                    total += process_file(path, index, buffer, matter_resolver)
+            except Exception as err:
+                raise err
+                print(f"Error; {err}")
+            else:
+                print("Done")
+
+    buffer.flush()
 
     print()
     print(f"Processed: {total}")
+    print(f"Files written: {buffer.written}")
+
+
+def process_file(
+    path: pathlib.Path,
+    index: HADeviceIndex | None = None,
+    buffer: WriteBuffer | None = None,
+    matter_resolver: MatterResolver | None = None,
+) -> UpdateRecord:
+    """Process a single file.
+
+    Pass an index to process multiple files against the same loaded index.
+    Pass a buffer to write the changed files later, otherwise they are
+    written when the file is processed. Unknown Matter devices are asked
+    for unless another resolver is passed.
+    """
+    data = VERSION_1_SCHEMA(json.loads(path.read_text()))
 
+    if index is None:
+        index = HADeviceIndex()
+        index.load()
 
-def process_file(path: pathlib.Path):
-    """Process a single file."""
-    total = UpdateRecord()
-    data = VERSION_1_SCHEMA(json.loads(path.read_text()))
+    flush = buffer is None
+    if buffer is None:
+        buffer = WriteBuffer()
 
-    index = HADeviceIndex()
-    index.load()
+    if matter_resolver is None:
+        matter_resolver = InteractiveMatterResolver()
+
+    total = process_rows(data["devices"], index, buffer, matter_resolver)
+
+    if flush:
+        buffer.flush()
+
+    return total
+
+
+def process_rows(
+    rows: Iterable[dict],
+    index: HADeviceIndex,
+    buffer: WriteBuffer,
+    matter_resolver: MatterResolver,
+) -> UpdateRecord:
+    """Process device rows."""
+    total = UpdateRecord()
     to_process = []
 
     # Ensure all companies and devices created
-    for device_info in data["devices"]:
+    for device_info in rows:
         if device_info["integration"] in IGNORED_INTEGRATIONS:
-            total.devices_ignored = 1
+            total.device_ignored += 1
             continue
 
         to_process.append(device_info)
+        ensure_device(index, device_info, buffer, matter_resolver, total)
 
-        company_key = device_info["integration"], device_info["manufacturer"]
-        company = index.companies.get(company_key)
-
-        if company is None:
-            company = create_company(index, device_info)
-            total.company_created += 1
-
-        device_key = (
-            device_info["integration"],
-            device_info["manufacturer"],
-            device_info["model_id"],
-        )
-
-        if device_key not in company.devices:
-            create_device(company, device_info)
-            total.device_created += 1
+    # Created entries are on disk already, write their links to HA with them.
+    buffer.flush()
 
     # Process via devices last
     for device_info in sorted(
@@ -102,75 +189,257 @@ def process_file(path: pathlib.Path):
             device_info["manufacturer"],
             device_info["model_id"],
         )
-        total += update_device(
-            index.companies[company_key].devices[device_key], device_info
-        )
+        device = index.companies[company_key].devices.get(device_key)
+        if device is None:
+            # Not resolved
+            continue
+        total += update_device(device, device_info, buffer)
+        buffer.row_processed()
 
     return total
 
 
-def create_company(index: HADeviceIndex, device_info: dict) -> HACompany:
+def ensure_device(
+    index: HADeviceIndex,
+    device_info: dict,
+    buffer: WriteBuffer,
+    matter_resolver: MatterResolver,
+    total: UpdateRecord,
+) -> HADevice | None:
+    """Return the device of a row, creating its company and device if needed.
+
+    Created entries are recorded in total. Returns None if the device was not
+    resolved.
+    """
+    company_key = device_info["integration"], device_info["manufacturer"]
+    company = index.companies.get(company_key)
+
+    if company is None:
+        company = create_company(index, device_info, buffer)
+        total.company_created += 1
+
+    device_key = (
+        device_info["integration"],
+        device_info["manufacturer"],
+        device_info["model_id"],
+    )
+
+    device = company.devices.get(device_key)
+    if device is None:
+        device = create_device(company, device_info, buffer, matter_resolver)
+        if device is None:
+            total.device_ignored += 1
+        elif device.device.is_new:
+            total.device_created += 1
+        else:
+            total.device_updated += 1
+
+    return device
+
+
+def dedup_rows(paths: Iterable[pathlib.Path]) -> tuple[list[dict], int]:
+    """Read the rows of all files and collapse identical rows.
+
+    Returns the unique rows in the order they were first seen and the number
+    of rows read.
+    """
+    unique: dict[tuple, dict] = {}
+    read = 0
+    for path in paths:
+        for device_info in read_rows(path):
+            read += 1
+            key = (
+                device_info["integration"],
+                device_info["manufacturer"],
+                device_info["model_id"],
+                device_info["model"],
+                device_info["sw_version"],
+                device_info["hw_version"],
+                device_info["has_suggested_area"],
+                device_info["has_configuration_url"],
+                device_info["via_device"] is not None,
+            )
+            unique.setdefault(key, device_info)
+    return list(unique.values()), read
+
+
+def read_rows(path: pathlib.Path) -> Iterator[dict]:
+    """Read and validate the rows of a JSON or CSV file."""
+    if path.suffix == ".csv":
+        return read_csv_rows(path)
+    return iter(VERSION_1_SCHEMA(json.loads(path.read_text()))["devices"])
+
+
+def process_csv_file(
+    path: pathlib.Path,
+    index: HADeviceIndex | None = None,
+    buffer: WriteBuffer | None = None,
+    matter_resolver: MatterResolver | None = None,
+) -> UpdateRecord:
+    """Process a CSV file generated by the template in the README.
+
+    The file is streamed twice, devices connected via another device are
+    processed in the second pass. Rows are never all held in memory.
+    """
+    total = UpdateRecord()
+
+    if index is None:
+        index = HADeviceIndex()
+        index.load()
+
+    flush = buffer is None
+    if buffer is None:
+        buffer = WriteBuffer()
+
+    if matter_resolver is None:
+        matter_resolver = InteractiveMatterResolver()
+
+    for via_pass in (False, True):
+        for device_info in read_csv_rows(path):
+            if (device_info["via_device"] is not None) is not via_pass:
+                continue
+
+            if device_info["integration"] in IGNORED_INTEGRATIONS:
+                # Counted once
+                if not via_pass:
+                    total.device_ignored += 1
+                continue
+
+            created = UpdateRecord()
+            device = ensure_device(index, device_info, buffer, matter_resolver, created)
+            total += created
+            if created != UpdateRecord():
+                # Created entries are on disk already, write their links to HA.
+                buffer.flush()
+            if device is None:
+                continue
+
+            total += update_device(device, device_info, buffer)
+            buffer.row_processed()
+
+    if flush:
+        buffer.flush()
+
+    return total
+
+
+def read_csv_rows(path: pathlib.Path) -> Iterator[dict]:
+    """Read and validate the rows of a CSV file one by one.
+
+    Blank lines before the header, as output by the template, are skipped.
+    """
+    with path.open(newline="") as fp:
+        reader = csv.reader(fp)
+
+        for header in reader:
+            if header:
+                break
+        else:
+            return
+
+        if [column.strip() for column in header] != CSV_COLUMNS:
+            raise ValueError(f"{path}:{reader.line_num}: unexpected header {header}")
+
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(CSV_COLUMNS):
+                raise ValueError(
+                    f"{path}:{reader.line_num}: expected {len(CSV_COLUMNS)} columns, got {len(row)}"
+                )
+
+            values = dict(zip(CSV_COLUMNS, row))
+            values["model"] = values.pop("model_name")
+            try:
+                values["via_device"] = json.loads(
+                    base64.b64decode(values["via_device"])
+                )
+                device_info = CSV_ROW_SCHEMA(values)
+            except (ValueError, vol.Invalid) as err:
+                raise ValueError(f"{path}:{reader.line_num}: {err}") from err
+
+            if device_info["model"] is None:
+                device_info["model"] = device_info["model_id"]
+            yield device_info
+
+
+def create_company(
+    index: HADeviceIndex, device_info: dict, buffer: WriteBuffer
+) -> HACompany:
     """Create a company and index it."""
     # TODO do we always just create a new one or should we ask
     # the user for an ID? Especially Matter can have duplicates.
 
-    # Company can already exist without HA link.
-    company_id = slugify(device_info["manufacturer"])
-    company = index.no_ha_data.pop(company_id, None)
-    if company is None:
-        company = create_company_entry(name=device_info["manufacturer"])
+    # Company can already exist, without HA link or linked with another
+    # integration.
+    company_id = NAME_INDEX.find_company(
+        device_info["manufacturer"]
+    ) or NAME_INDEX.find_company_slug(device_info["manufacturer"])
+    ha_company = None
+    if company_id is not None:
+        ha_company = index.no_ha_data.pop(company_id, None) or index.by_id.get(
+            company_id
+        )
+    if ha_company is None:
+        ha_company = HACompany(create_company_entry(name=device_info["manufacturer"]))
+        index.all_companies.append(ha_company)
+        index.by_id[ha_company.id] = ha_company
 
     # Set Home Assistant specific data
-    ha_path = company.path / DataSource.HOME_ASSISTANT
-    info_path = ha_path / "info.yaml"
-    info = yaml.safe_load(info_path.read_text())
-    info["integrations"].append(
+    ha_company.ha_info["integrations"].append(
         {
             "integration": device_info["integration"],
             "manufacturer": device_info["manufacturer"],
         }
     )
-    info_path.write_text(yaml.dump(info))
+    buffer.mark(ha_company.ha_info_path, ha_company.ha_info)
 
     # Update index
     company_key = device_info["integration"], device_info["manufacturer"]
-    ha_company = HACompany(company)
     index.companies[company_key] = ha_company
     return ha_company
 
 
-def create_device(company: HACompany, device_info: dict) -> HADevice:
-    """Create a device and index it."""
+def create_device(
+    company: HACompany,
+    device_info: dict,
+    buffer: WriteBuffer,
+    matter_resolver: MatterResolver,
+) -> HADevice | None:
+    """Create a device and index it.
+
+    Returns None if the model ID of a Matter device could not be resolved.
+    """
     # TODO do we always just create a new one or should we ask
     # the user for an ID? Especially Matter can have duplicates.
 
     model_id = device_info["model_id"]
 
     if device_info["integration"] == "matter":
-        print()
-        print(
-            f"Detected Matter device for {device_info['manufacturer']} with model id {device_info['model_id']}."
+        model_id = matter_resolver.resolve(device_info)
+        if model_id is None:
+            return None
+
+    # A device can have multiple Matter product IDs. Device directories are
+    # not always the slug of the model ID, so look the model ID up.
+    device_id = NAME_INDEX.find_device(company.id, model_id)
+    for ha_device in company.ha_devices:
+        if ha_device.id == device_id:
+            break
+    else:
+        ha_device = HADevice(
+            create_device_entry(company.company, model_id, device_info["model"] or None)
         )
-        print("We don't like the number as model ID and need you to define a new one.")
-        print("Please find the Matter model name @ https://webui.dcl.csa-iot.org/")
-        model_id = slugify(input("New, human readable, model ID: ").strip())
-
-    device = create_device_entry(
-        company.company, model_id, device_info["model"] or None
-    )
 
     # Set Home Assistant specific data
-    ha_path = device.path / DataSource.HOME_ASSISTANT
-    info_path = ha_path / "info.yaml"
-    info = yaml.safe_load(info_path.read_text())
-    info["integrations"].append(
+    ha_device.ha_info["integrations"].append(
         {
             "integration": device_info["integration"],
             "manufacturer": device_info["manufacturer"],
-            "model_id": model_id,
+            "model_id": device_info["model_id"],
         }
     )
-    info_path.write_text(yaml.dump(info))
+    buffer.mark(ha_device.ha_info_path, ha_device.ha_info)
 
     # Update index
     device_key = (
@@ -178,12 +447,15 @@ def create_device(company: HACompany, device_info: dict) -> HADevice:
         device_info["manufacturer"],
         device_info["model_id"],
     )
-    ha_device = HADevice(device)
+    if ha_device not in company.ha_devices:
+        company.ha_devices.append(ha_device)
     company.devices[device_key] = ha_device
     return ha_device
 
 
-def update_device(device: HADevice, device_info: dict) -> UpdateRecord:
+def update_device(
+    device: HADevice, device_info: dict, buffer: WriteBuffer
+) -> UpdateRecord:
     """Record the device data from a device_info."""
     update_record = UpdateRecord()
 
@@ -200,7 +472,7 @@ def update_device(device: HADevice, device_info: dict) -> UpdateRecord:
             info_changed = True
 
     if info_changed:
-        device.ha_info_path.write_text(yaml.dump(device.ha_info))
+        buffer.mark(device.ha_info_path, device.ha_info)
 
     version_changed = False
     version = {}
@@ -209,9 +481,8 @@ def update_device(device: HADevice, device_info: dict) -> UpdateRecord:
     if device_info["hw_version"]:
         version["hardware"] = device_info["hw_version"]
 
-    if version and version not in device.ha_versions["versions"]:
-        device.ha_versions["versions"].append(version)
-        device.ha_versions_path.write_text(yaml.dump(device.ha_versions))
+    if version and device.add_version(version):
+        buffer.mark(device.ha_versions_path, device.ha_versions)
         version_changed = True
 
     # TODO via_device to be included in versions
@@ -0,0 +1,131 @@
+"""Resolve the model ID of Matter devices.
+
+Home Assistant reports the numeric Matter product ID as model ID. The
+database uses a human readable model ID instead, which is looked up in a
+table of known products (see data/matter_models.csv) first.
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import json
+import pathlib
+
+from slugify import slugify
+
+from .const import CSV_COLUMNS, DEFERRED_DIR, MATTER_MODELS_FILE
+
+
+def load_matter_models(
+    path: pathlib.Path = MATTER_MODELS_FILE,
+) -> dict[tuple[str, str], str]:
+    """Load the model IDs of known Matter products.
+
+    The table maps (manufacturer, product ID) to the model ID. Rows without
+    a model ID are ignored.
+    """
+    table = {}
+    with path.open(newline="") as fp:
+        for row in csv.DictReader(fp):
+            if row["model_id"]:
+                table[(row["manufacturer"], row["product_id"])] = row["model_id"]
+    return table
+
+
+class MatterResolver:
+    """Resolve the model ID of Matter devices with a lookup table."""
+
+    def __init__(self, table: dict[tuple[str, str], str] | None = None) -> None:
+        self.table = load_matter_models() if table is None else table
+
+    def resolve(self, device_info: dict) -> str | None:
+        """Return the model ID of a device, None to skip the device."""
+        model_id = self.table.get(
+            (device_info["manufacturer"], device_info["model_id"])
+        )
+        if model_id is None:
+            model_id = self.resolve_unknown(device_info)
+        return model_id
+
+    def resolve_unknown(self, device_info: dict) -> str | None:
+        """Return the model ID of a device that is not in the table."""
+        return None
+
+
+class InteractiveMatterResolver(MatterResolver):
+    """Ask the user for the model ID of unknown devices."""
+
+    def resolve_unknown(self, device_info: dict) -> str | None:
+        """Ask the user for the model ID."""
+        print()
+        print(
+            f"Detected Matter device for {device_info['manufacturer']} with model id {device_info['model_id']}."
+        )
+        print("We don't like the number as model ID and need you to define a new one.")
+        print("Please find the Matter model name @ https://webui.dcl.csa-iot.org/")
+        model_id = slugify(input("New, human readable, model ID: ").strip())
+        self.table[(device_info["manufacturer"], device_info["model_id"])] = model_id
+        return model_id
+
+
+class DeferMatterResolver(MatterResolver):
+    """Queue unknown devices for review instead of asking for them.
+
+    The rows of unknown products are written in full to a CSV file in the
+    format of the template in the README. Once their model IDs are added to
+    the lookup table, the file can be moved to the process directory to
+    process the rows again.
+    """
+
+    def __init__(
+        self,
+        table: dict[tuple[str, str], str] | None = None,
+        path: pathlib.Path = DEFERRED_DIR / "matter.csv",
+    ) -> None:
+        super().__init__(table)
+        self.path = path
+        self.deferred: set[tuple[str, ...]] = set()
+        if path.exists():
+            with path.open(newline="") as fp:
+                reader = csv.reader(fp)
+                next(reader, None)
+                self.deferred.update(tuple(row) for row in reader if row)
+
+    def resolve_unknown(self, device_info: dict) -> str | None:
+        """Queue the row of the device and skip it."""
+        row = tuple(csv_row(device_info))
+        if row in self.deferred:
+            return None
+        self.deferred.add(row)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.path.exists()
+        with self.path.open("a", newline="") as fp:
+            writer = csv.writer(fp)
+            if is_new:
+                writer.writerow(CSV_COLUMNS)
+            writer.writerow(row)
+        return None
+
+
+def csv_row(device_info: dict) -> list[str]:
+    """Return the values of a device row as written by the README template."""
+    via_device = device_info["via_device"]
+    if via_device is not None and not isinstance(via_device, dict):
+        # JSON files only contain the index of the via device.
+        via_device = {}
+    values = {
+        **device_info,
+        "model_name": device_info["model"],
+        "via_device": base64.b64encode(json.dumps(via_device).encode()).decode(),
+        "entry_type": device_info.get("entry_type"),
+        "is_via_device": device_info.get("is_via_device", False),
+    }
+    return [str(values[column]) for column in CSV_COLUMNS]
+
+
+MATTER_RESOLVERS = {
+    "interactive": InteractiveMatterResolver,
+    "defer": DeferMatterResolver,
+}
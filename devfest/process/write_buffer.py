@@ -0,0 +1,44 @@
+"""Buffer YAML writes during processing."""
+
+from __future__ import annotations
+
+import pathlib
+from typing import Any
+
+from ..yaml_util import write_yaml
+
+
+class WriteBuffer:
+    """Collect changed YAML files and write each of them once.
+
+    Files are marked dirty with the data to write. The data is serialized
+    when the buffer is flushed, so a file changed many times is written
+    once with its latest content.
+    """
+
+    def __init__(self, checkpoint: int = 0) -> None:
+        """Initialize the buffer.
+
+        With a checkpoint, the buffer is flushed every `checkpoint` rows.
+        """
+        self.checkpoint = checkpoint
+        self.dirty: dict[pathlib.Path, Any] = {}
+        self.rows = 0
+        self.written = 0
+
+    def mark(self, path: pathlib.Path, data: Any) -> None:
+        """Mark a file to be written with data."""
+        self.dirty[path] = data
+
+    def row_processed(self) -> None:
+        """Count a processed row and flush at checkpoints."""
+        self.rows += 1
+        if self.checkpoint and self.rows % self.checkpoint == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all dirty files."""
+        for path, data in self.dirty.items():
+            write_yaml(path, data)
+        self.written += len(self.dirty)
+        self.dirty.clear()
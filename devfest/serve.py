@@ -0,0 +1,266 @@
+"""Serve device lookups over HTTP.
+
+The index is loaded once and kept in memory. It is loaded again when files
+in the database change.
+
+    GET /lookup?integration=zha&manufacturer=Aqara&model_id=lumi.plug
+    GET /search?prefix=lumi.&integration=zha&manufacturer=Aqara
+    GET /works_with_ha?integration=zha&badge=zigbee
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import os
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import click
+
+from .const import DATABASE_DIR, DataSource
+from .file_util import mtime_or_none
+from .models.home_assistant import HADeviceIndex
+from .website.const import BASE_URL
+
+# Maximum number of results of a search
+MAX_RESULTS = 100
+
+
+class QueryIndex:
+    """Devices indexed for queries by their Home Assistant keys."""
+
+    def __init__(self, index: HADeviceIndex) -> None:
+        # (integration, manufacturer, model_id) => device
+        self.devices: dict[tuple[str, str, str], dict] = {}
+        # integration => devices with a badge
+        self.works_with_ha: dict[str, list[dict]] = {}
+
+        for company in index.companies.values():
+            for key, ha_device in company.devices.items():
+                if key in self.devices:
+                    continue
+                device = {
+                    "integration": key[0],
+                    "manufacturer": key[1],
+                    "model_id": key[2],
+                    "company_id": company.id,
+                    "company_name": company.name,
+                    "device_id": ha_device.id,
+                    "model_name": ha_device.model_name,
+                    "is_works_with_ha": ha_device.ha_info["is_works_with_ha"],
+                    "url": f"{BASE_URL}/database/{company.id}/devices/{ha_device.id}/info.json",
+                }
+                self.devices[key] = device
+                for integration in ha_device.ha_info["is_works_with_ha"] or {}:
+                    if integration == key[0]:
+                        self.works_with_ha.setdefault(integration, []).append(device)
+
+        # Sorted casefolded model IDs for prefix searches
+        self.model_ids = sorted((key[2].casefold(), key) for key in self.devices)
+
+    def lookup(self, integration: str, manufacturer: str, model_id: str) -> dict | None:
+        """Return the device with a key."""
+        return self.devices.get((integration, manufacturer, model_id))
+
+    def search(
+        self,
+        prefix: str,
+        integration: str | None = None,
+        manufacturer: str | None = None,
+    ) -> list[dict]:
+        """Return devices whose model ID starts with a prefix, ignoring case."""
+        prefix = prefix.casefold()
+        results = []
+        start = bisect.bisect_left(self.model_ids, (prefix,))
+        for model_id, key in self.model_ids[start:]:
+            if not model_id.startswith(prefix) or len(results) == MAX_RESULTS:
+                break
+            if integration is not None and key[0] != integration:
+                continue
+            if manufacturer is not None and key[1] != manufacturer:
+                continue
+            results.append(self.devices[key])
+        return results
+
+    def badges(self, integration: str, badge: str | None = None) -> list[dict]:
+        """Return the devices with a works with HA badge for an integration."""
+        return [
+            device
+            for device in self.works_with_ha.get(integration, [])
+            if badge is None or device["is_works_with_ha"][integration] == badge
+        ]
+
+
+def load_query_index() -> QueryIndex:
+    """Load the query index from the database."""
+    index = HADeviceIndex()
+    index.load()
+    return QueryIndex(index)
+
+
+def database_signature() -> int:
+    """Return a value that changes when files read by the index change.
+
+    Only the directories and the YAML files that are loaded are checked.
+    Directory modification times change when entries are added or removed.
+    """
+    mtimes = [mtime_or_none(DATABASE_DIR)]
+    for company_dir in os.scandir(DATABASE_DIR):
+        if not company_dir.is_dir():
+            continue
+        mtimes.extend(_entry_mtimes(company_dir.path))
+        devices_path = os.path.join(company_dir.path, "devices")
+        mtimes.append(mtime_or_none(devices_path))
+        if not os.path.isdir(devices_path):
+            continue
+        for device_dir in os.scandir(devices_path):
+            if device_dir.is_dir():
+                mtimes.extend(_entry_mtimes(device_dir.path))
+    return hash(tuple(mtimes))
+
+
+def _entry_mtimes(path: str) -> list[int | None]:
+    """Return the modification times of a company or device that is loaded."""
+    ha_path = os.path.join(path, DataSource.HOME_ASSISTANT)
+    return [
+        mtime_or_none(path),
+        mtime_or_none(os.path.join(path, "info.yaml")),
+        mtime_or_none(ha_path),
+        mtime_or_none(os.path.join(ha_path, "info.yaml")),
+        mtime_or_none(os.path.join(ha_path, "versions.yaml")),
+    ]
+
+
+class DeviceServer:
+    """HTTP server answering queries from the query index."""
+
+    def __init__(self, reload_interval: float = 2.0) -> None:
+        self.reload_interval = reload_interval
+        self.index: QueryIndex | None = None
+        self.signature: int | None = None
+
+    async def load(self) -> None:
+        """Load the index if the database changed."""
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(None, database_signature)
+        if signature == self.signature:
+            return
+        # Loading can take a while, queries are answered by the old index.
+        self.index = await loop.run_in_executor(None, load_query_index)
+        self.signature = signature
+
+    async def reload_on_change(self) -> None:
+        """Reload the index when the database changes."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.load()
+            except Exception as err:
+                print(f"Error reloading: {err}")
+
+    def handle(self, path: str) -> tuple[HTTPStatus, object]:
+        """Answer a request."""
+        url = urlsplit(path)
+        query = dict(parse_qsl(url.query))
+
+        try:
+            if url.path == "/lookup":
+                device = self.index.lookup(
+                    query["integration"], query["manufacturer"], query["model_id"]
+                )
+                if device is None:
+                    return HTTPStatus.NOT_FOUND, {"error": "Device not found"}
+                return HTTPStatus.OK, device
+
+            if url.path == "/search":
+                return HTTPStatus.OK, self.index.search(
+                    query["prefix"],
+                    query.get("integration"),
+                    query.get("manufacturer"),
+                )
+
+            if url.path == "/works_with_ha":
+                return HTTPStatus.OK, self.index.badges(
+                    query["integration"], query.get("badge")
+                )
+        except KeyError as err:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Missing parameter {err}"}
+
+        return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the requests of a connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                keep_alive = True
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "connection":
+                        keep_alive = value.strip().lower() != "close"
+
+                try:
+                    method, path, _ = request_line.decode("latin-1").split()
+                except ValueError:
+                    status, data = HTTPStatus.BAD_REQUEST, {"error": "Bad request"}
+                    keep_alive = False
+                else:
+                    if method != "GET":
+                        status = HTTPStatus.METHOD_NOT_ALLOWED
+                        data = {"error": "Method not allowed"}
+                    else:
+                        status, data = self.handle(path)
+
+                body = json.dumps(data).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        """Load the index and serve requests until cancelled."""
+        await self.load()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving on http://{host}:{port}")
+        reloader = asyncio.ensure_future(self.reload_on_change())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reloader.cancel()
+
+
+@click.option("--host", default="127.0.0.1", show_default=True, help="Host to bind.")
+@click.option("--port", default=8080, show_default=True, help="Port to bind.")
+@click.option(
+    "--reload-interval",
+    default=2.0,
+    show_default=True,
+    help="Seconds between checks for changed files.",
+)
+def serve(host: str = "127.0.0.1", port: int = 8080, reload_interval: float = 2.0):
+    """Serve device lookups over HTTP."""
+    try:
+        asyncio.run(DeviceServer(reload_interval).serve(host, port))
+    except KeyboardInterrupt:
+        pass
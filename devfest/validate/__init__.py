@@ -1,32 +1,106 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from pprint import pprint
+from typing import Collection
+
+import click
 
-from ..models.base import load_companies
+from ..models.cache import DATABASE_CACHE
+from ..models.home_assistant import HACompany, HADeviceIndex
+from .changes import collect_changes, git_changed_paths
 from .data.base_company import validate_company
 from .data.base_device import validate_device
-from .data.home_assistant_company import validate_home_assistant
+from .data.home_assistant_company import (
+    company_key_conflicts,
+    validate_home_assistant,
+)
 from .models import CompanyReport
 
 
-def validate():
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    show_default=True,
+    help="Number of processes used to validate companies.",
+)
+@click.option(
+    "--path",
+    "paths",
+    multiple=True,
+    type=click.Path(path_type=pathlib.Path),
+    help="Only validate the companies and devices of this path. Can be repeated.",
+)
+@click.option(
+    "--since",
+    help="Only validate the companies and devices changed in this git revision range.",
+)
+def validate(
+    jobs: int = 1,
+    paths: Collection[pathlib.Path] = (),
+    since: str | None = None,
+):
     """Validate everything."""
-    errors: list[CompanyReport] = []
-    for company in load_companies():
-        report = validate_company(company)
+    # Devices are loaded on first use, so only what is validated is read.
+    index = HADeviceIndex()
+    index.load()
 
-        if report.company_errors:
-            errors.append(report)
-            continue
+    if paths or since:
+        changes = collect_changes(
+            [*paths, *(git_changed_paths(since) if since else [])]
+        )
+        companies = [
+            company
+            for company in index.all_companies
+            if company.id in changes.company_ids
+        ]
+        device_ids = [changes.devices.get(company.id, set()) for company in companies]
+        check_company_keys = bool(changes.companies)
+        print(f"Validating {len(companies)} changed companies")
+    else:
+        changes = None
+        companies = index.all_companies
+        device_ids = [None] * len(companies)
+        check_company_keys = True
 
-        for device in company.devices:
-            device_report = validate_device(report, device)
-            if device_report.errors:
-                report.device_errors.append(device_report)
+    if jobs > 1:
+        reports = []
+        with ProcessPoolExecutor(jobs) as executor:
+            for report, cache_entries in executor.map(
+                _validate_all_job,
+                companies,
+                device_ids,
+                chunksize=max(1, len(companies) // (jobs * 4)),
+            ):
+                reports.append(report)
+                DATABASE_CACHE.merge(cache_entries)
+    else:
+        reports = [
+            validate_all(company, company_device_ids)
+            for company, company_device_ids in zip(companies, device_ids)
+        ]
 
-        validate_home_assistant(report)
+    if check_company_keys:
+        conflicts = company_key_conflicts(index.all_companies)
+        for position, company in enumerate(companies):
+            if changes is not None and company.id not in changes.companies:
+                continue
+            messages = [
+                f"Integration {key} is also used by "
+                + ", ".join(other for other in ids if other != company.id)
+                for key, ids in conflicts.items()
+                if company.id in ids
+            ]
+            if not messages:
+                continue
+            report = reports[position] or CompanyReport(company.company)
+            report.company_errors["home-assistant/info.yaml"].extend(messages)
+            reports[position] = report
 
-        if report.device_errors:
-            errors.append(report)
+    errors: list[CompanyReport] = [report for report in reports if report is not None]
 
     if not errors:
         print("No errors found")
@@ -52,3 +126,41 @@ def validate():
         print()
 
     return 1
+
+
+def validate_all(
+    company: HACompany, device_ids: Collection[str] | None = None
+) -> CompanyReport | None:
+    """Validate a company and its devices. Return the report if it has errors.
+
+    Pass device IDs to only validate those devices.
+    """
+    report = validate_company(company.company)
+
+    if report.company_errors:
+        return report
+
+    for device in company.company.devices:
+        if device_ids is not None and device.id not in device_ids:
+            continue
+        device_report = validate_device(report, device)
+        if device_report.errors:
+            report.device_errors.append(device_report)
+
+    validate_home_assistant(report, company, device_ids)
+
+    if report.device_errors:
+        return report
+
+    return None
+
+
+def _validate_all_job(
+    company: HACompany, device_ids: Collection[str] | None
+) -> tuple[CompanyReport | None, dict]:
+    """Validate a company in a worker process.
+
+    Returns the report with the files parsed by the worker, which are added
+    to the cache of the main process.
+    """
+    return validate_all(company, device_ids), DATABASE_CACHE.take_updated()
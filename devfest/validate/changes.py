@@ -0,0 +1,47 @@
+"""Find the companies and devices touched by changed files."""
+
+from __future__ import annotations
+
+import pathlib
+import subprocess
+from typing import Iterable
+
+from ..const import DATABASE_DIR, ROOT_DIR
+from .models import ChangeSet
+
+
+def git_changed_paths(rev_range: str) -> list[pathlib.Path]:
+    """Return the paths changed in a git revision range."""
+    result = subprocess.run(
+        ["git", "diff", "--name-only", rev_range],
+        cwd=ROOT_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return [ROOT_DIR / line for line in result.stdout.splitlines() if line]
+
+
+def collect_changes(paths: Iterable[pathlib.Path]) -> ChangeSet:
+    """Map changed paths to their company or device.
+
+    Paths outside of the database are ignored.
+    """
+    changes = ChangeSet()
+
+    for path in paths:
+        try:
+            parts = path.resolve().relative_to(DATABASE_DIR).parts
+        except ValueError:
+            continue
+
+        if not parts:
+            continue
+
+        company_id = parts[0]
+        if len(parts) >= 3 and parts[1] == "devices":
+            changes.devices[company_id].add(parts[2])
+        else:
+            changes.companies.add(company_id)
+
+    return changes
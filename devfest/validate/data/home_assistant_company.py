@@ -1,9 +1,14 @@
 """Validate Home Assistant data."""
 
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Collection
+
 import voluptuous as vol
 
 from ...models.home_assistant import HACompany
-from ..models import CompanyReport
+from ..models import CompanyReport, DeviceReport
 from .home_assistant_device import validate_device
 
 COMPANY_INFO_SCHEMA = vol.Schema(
@@ -18,16 +23,37 @@ COMPANY_INFO_SCHEMA = vol.Schema(
 )
 
 
-def validate_home_assistant(report: CompanyReport) -> None:
-    """Run Home Assistant validation."""
-    company = HACompany(report.company)
+def validate_home_assistant(
+    report: CompanyReport,
+    company: HACompany,
+    device_ids: Collection[str] | None = None,
+) -> None:
+    """Run Home Assistant validation.
+
+    Pass device IDs to only validate those devices.
+    """
     validate_company(report, company)
 
     for device in company.devices.values():
+        if device_ids is not None and device.id not in device_ids:
+            continue
         device_report = validate_device(device)
         if device_report.errors:
             report.device_errors.append(device_report)
 
+    for key, devices in company.key_conflicts.items():
+        if device_ids is not None and not any(
+            device.id in device_ids for device in devices
+        ):
+            continue
+        for device in devices:
+            others = ", ".join(other.id for other in devices if other is not device)
+            device_report = DeviceReport(device.device)
+            device_report.errors["home-assistant/info.yaml"].append(
+                f"Integration {key} is also used by {others}"
+            )
+            report.device_errors.append(device_report)
+
 
 def validate_company(report: CompanyReport, company: HACompany) -> CompanyReport:
     """Validate a company."""
@@ -39,3 +65,18 @@ def validate_company(report: CompanyReport, company: HACompany) -> CompanyReport
         report.company_errors["home-assistant/info.yaml"].append(str(err))
 
     return report
+
+
+def company_key_conflicts(
+    companies: list[HACompany],
+) -> dict[tuple[str, str], list[str]]:
+    """Return integration keys that are used by more than one company."""
+    claims: dict[tuple[str, str], list[str]] = defaultdict(list)
+
+    for company in companies:
+        for integration in company.ha_info["integrations"]:
+            claims[(integration["integration"], integration["manufacturer"])].append(
+                company.id
+            )
+
+    return {key: ids for key, ids in claims.items() if len(ids) > 1}
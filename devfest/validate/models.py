@@ -1,4 +1,5 @@
 """Validation models."""
+
 from __future__ import annotations
 import dataclasses
 from collections import defaultdict
@@ -24,3 +25,21 @@ class DeviceReport:
     errors: dict[str, list[str]] = dataclasses.field(
         default_factory=lambda: defaultdict(list)
     )
+
+
+@dataclasses.dataclass
+class ChangeSet:
+    """Companies and devices touched by a set of changed paths."""
+
+    # Companies with changes outside of their devices
+    companies: set[str] = dataclasses.field(default_factory=set)
+
+    # Company ID => changed device IDs
+    devices: dict[str, set[str]] = dataclasses.field(
+        default_factory=lambda: defaultdict(set)
+    )
+
+    @property
+    def company_ids(self) -> set[str]:
+        """Return IDs of all touched companies."""
+        return self.companies | set(self.devices)
@@ -2,20 +2,79 @@
 
 import shutil
 
+import click
+
 from ..models.home_assistant import HADeviceIndex
 from .const import WEBSITE_DIR
+from .files import ASSET_MODES, JSONFormat, brotli
+from .manifest import BuildManifest
+from .markdown import prune_markdown_cache
 from .output.json import generate_json
+from .output.lookup import generate_lookup
+from .output.sqlite import generate_sqlite
 from .output.works_with_ha import generate_works_with_ha
 
 
-def generate_website():
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only regenerate the output of companies and devices that changed.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    show_default=True,
+    help="Number of processes used to generate companies.",
+)
+@click.option(
+    "--assets",
+    type=click.Choice(ASSET_MODES),
+    default="copy",
+    show_default=True,
+    help="How files output unchanged are materialized. Links fall back to copies.",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Write JSON without whitespace and with sorted keys.",
+)
+@click.option(
+    "--precompress",
+    is_flag=True,
+    help="Write gzip and brotli compressed copies of the JSON files.",
+)
+def generate_website(
+    incremental: bool = False,
+    jobs: int = 1,
+    assets: str = "copy",
+    compact: bool = False,
+    precompress: bool = False,
+):
     """Generate the website."""
-    shutil.rmtree(WEBSITE_DIR, ignore_errors=True)
-    WEBSITE_DIR.mkdir(parents=True)
+    manifest = BuildManifest()
+    json_format = JSONFormat(compact=compact, precompress=precompress)
+
+    if precompress and brotli is None:
+        print("brotli is not installed, only writing gzip compressed files.")
+
+    if incremental:
+        manifest.load()
+    else:
+        shutil.rmtree(WEBSITE_DIR, ignore_errors=True)
+
+    WEBSITE_DIR.mkdir(parents=True, exist_ok=True)
 
     ha_index = HADeviceIndex()
     ha_index.load()
 
-    generate_json(ha_index)
-    generate_works_with_ha(ha_index)
+    generate_json(ha_index, manifest, jobs, assets, json_format)
+    generate_works_with_ha(ha_index, json_format)
+    generate_lookup(ha_index, json_format)
+    generate_sqlite(ha_index, manifest)
+    manifest.save()
+
+    removed = prune_markdown_cache()
+    if removed:
+        print(f"Removed {removed} unused markdown cache entries")
     print("Done!")
@@ -0,0 +1,156 @@
+"""File helpers for website generation."""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import os
+import pathlib
+import shutil
+from typing import Any, Collection
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def write_text_if_changed(path: pathlib.Path, content: str) -> bool:
+    """Write a file only if its content changed. Return if it was written."""
+    try:
+        if path.read_text() == content:
+            return False
+    except FileNotFoundError:
+        pass
+
+    path.write_text(content)
+    return True
+
+
+@dataclasses.dataclass(frozen=True)
+class JSONFormat:
+    """Format of the JSON files in the website.
+
+    Compact JSON has no whitespace and sorted keys. With precompress, a gzip
+    and a brotli (if installed) compressed copy is written next to each file.
+    """
+
+    compact: bool = False
+    precompress: bool = False
+
+    @property
+    def variant(self) -> str:
+        """Return a key for the output of this format."""
+        return f"compact={self.compact},precompress={self.precompress}"
+
+    def dumps(self, data: Any) -> str:
+        """Serialize data to JSON."""
+        if self.compact:
+            return json.dumps(data, separators=(",", ":"), sort_keys=True)
+        return json.dumps(data, indent=2)
+
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def write_json(
+    path: pathlib.Path,
+    data: Any,
+    json_format: JSONFormat = JSONFormat(),
+    if_changed: bool = False,
+) -> bool:
+    """Write a JSON file and its compressed copies. Return if it was written.
+
+    With if_changed, files are only written if the JSON changed.
+    """
+    content = json_format.dumps(data)
+    if if_changed:
+        written = write_text_if_changed(path, content)
+    else:
+        path.write_text(content)
+        written = True
+
+    compressed = {}
+    if json_format.precompress:
+        raw = content.encode()
+        compressed[".gz"] = lambda: gzip.compress(raw, compresslevel=9, mtime=0)
+        if brotli is not None:
+            compressed[".br"] = lambda: brotli.compress(raw)
+
+    for suffix in COMPRESSED_SUFFIXES:
+        sibling = path.with_name(f"{path.name}{suffix}")
+        if suffix not in compressed:
+            if sibling.exists():
+                sibling.unlink()
+        elif written or not sibling.exists():
+            sibling.write_bytes(compressed[suffix]())
+
+    return written
+
+
+def remove_stale_json(directory: pathlib.Path, names: Collection[str]) -> None:
+    """Remove the JSON files of a directory that are not in names.
+
+    Compressed copies are removed with their file.
+    """
+    for path in directory.iterdir():
+        name = path.name
+        for suffix in COMPRESSED_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[: -len(suffix)]
+        if name not in names:
+            path.unlink()
+
+
+ASSET_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl to clone a file on Linux, from linux/fs.h
+FICLONE = 0x40049409
+
+
+def materialize(source: pathlib.Path, target: pathlib.Path, mode: str = "copy") -> None:
+    """Materialize a file that is output unchanged.
+
+    Hardlinks and reflinks fall back to copying the file when the
+    filesystem does not support them, for example across filesystems.
+    Hardlinked files share their content with the database, so they
+    must never be written to.
+    """
+    if target.exists() or target.is_symlink():
+        target.unlink()
+
+    if mode == "hardlink":
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+
+    elif mode == "reflink" and _reflink(source, target):
+        return
+
+    shutil.copy2(source, target)
+
+
+def _reflink(source: pathlib.Path, target: pathlib.Path) -> bool:
+    """Clone a file. Return if it was cloned."""
+    try:
+        import fcntl
+    except ImportError:
+        # Not available on Windows
+        return False
+
+    with source.open("rb") as src, target.open("wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            cloned = False
+        else:
+            cloned = True
+
+    if cloned:
+        shutil.copystat(source, target)
+    else:
+        target.unlink()
+    return cloned
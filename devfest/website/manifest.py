@@ -0,0 +1,90 @@
+"""Build manifest for incremental website generation."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+from typing import Iterable
+
+from ..const import CACHE_DIR
+from ..file_util import write_text_atomic
+
+MANIFEST_PATH = CACHE_DIR / "website-manifest.json"
+
+
+class BuildManifest:
+    """Content hashes of the sources that were used for each output."""
+
+    def __init__(self, path: pathlib.Path = MANIFEST_PATH) -> None:
+        self.path = path
+        self.previous: dict[str, str] = {}
+        self.current: dict[str, str] = {}
+
+    def load(self) -> None:
+        """Load the manifest of the previous build."""
+        try:
+            self.previous = json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+
+    def save(self) -> None:
+        """Store the manifest of this build."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.path, json.dumps(self.current, indent=2, sort_keys=True))
+
+    def by_company(self) -> dict[str, BuildManifest]:
+        """Return manifests with only the previous entries of each company."""
+        manifests: dict[str, BuildManifest] = {}
+        for key, digest in self.previous.items():
+            company_id = key.partition("/")[0]
+            manifest = manifests.get(company_id)
+            if manifest is None:
+                manifest = manifests[company_id] = BuildManifest(self.path)
+            manifest.previous[key] = digest
+        return manifests
+
+    def is_current(self, key: str, digest: str, output: pathlib.Path) -> bool:
+        """Record the digest of a source and return if its output is up to date."""
+        self.current[key] = digest
+        return self.previous.get(key) == digest and output.exists()
+
+
+def source_key(company_id: str) -> str:
+    """Return the key of the digest of all source files of a company.
+
+    Unlike the digests of outputs, it does not depend on the output format.
+    """
+    return f"{company_id}/source"
+
+
+def hash_values(*values: str) -> str:
+    """Return a digest of strings."""
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_files(root: pathlib.Path, paths: Iterable[pathlib.Path], *extra: str) -> str:
+    """Return a digest of the names and contents of files and directories."""
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(value.encode())
+        digest.update(b"\0")
+
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(child for child in path.rglob("*") if child.is_file())
+        else:
+            files.append(path)
+
+    for path in sorted(files):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
@@ -1,9 +1,68 @@
 """Markdown helpers."""
 
+import hashlib
+import os
+import time
+from importlib.metadata import version
+
 import humanmark
 
+from ..const import CACHE_DIR
+from ..file_util import write_text_atomic
+
+MARKDOWN_CACHE_DIR = CACHE_DIR / "markdown"
+# Cached output that was not used for this long is removed
+MARKDOWN_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+# Rendered output depends on the humanmark version
+_HUMANMARK_VERSION = version("humanmark")
+
 
 def prefix_images(text, prefix):
+    """Prefix all images in a markdown text with a URL.
+
+    The output is cached by content and prefix between builds. Using a cache
+    entry updates its modification time, see prune_markdown_cache.
+    """
+    # humanmark does not round-trip markdown unchanged, so text without
+    # images still has to be rendered.
+    key = hashlib.sha256(
+        "\0".join((_HUMANMARK_VERSION, prefix, text)).encode()
+    ).hexdigest()
+    cache_path = MARKDOWN_CACHE_DIR / key[:2] / key
+
+    try:
+        output = cache_path.read_text()
+    except FileNotFoundError:
+        pass
+    else:
+        os.utime(cache_path)
+        return output
+
+    output = _prefix_images(text, prefix)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    write_text_atomic(cache_path, output)
+    return output
+
+
+def prune_markdown_cache(max_age: float = MARKDOWN_CACHE_MAX_AGE) -> int:
+    """Remove cached output that was not used recently.
+
+    Returns the number of removed entries.
+    """
+    if not MARKDOWN_CACHE_DIR.exists():
+        return 0
+
+    oldest = time.time() - max_age
+    removed = 0
+    for cache_path in MARKDOWN_CACHE_DIR.glob("*/*"):
+        if cache_path.stat().st_mtime < oldest:
+            cache_path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _prefix_images(text, prefix):
     """Prefix all images in a markdown text with a URL."""
     doc = humanmark.loads(text)
 
@@ -1,97 +1,262 @@
 """Generate a JSON structure of all devices."""
 
-import json
+from __future__ import annotations
+
 import pathlib
 import shutil
-
-import yaml
+from concurrent.futures import ProcessPoolExecutor
 
 from ...const import DATABASE_DIR
-from ...models.base import Device
-from ...models.home_assistant import HADeviceIndex
+from ...models.home_assistant import HACompany, HADeviceIndex
+from ...models.cache import DATABASE_CACHE, load_yaml
 from ..const import BASE_URL, WEBSITE_DIR
+from ..files import JSONFormat, materialize, write_json
+from ..manifest import BuildManifest, hash_files, hash_values, source_key
 from ..markdown import prefix_images
 
+INFO_FILE = pathlib.Path("info.yaml")
+
+
+def generate_json(
+    index: HADeviceIndex,
+    manifest: BuildManifest,
+    jobs: int = 1,
+    assets: str = "copy",
+    json_format: JSONFormat = JSONFormat(),
+):
+    """Generate a JSON structure of all devices.
 
-def generate_json(index: HADeviceIndex):
-    """Generate a JSON structure of all devices."""
+    Outputs whose sources did not change since the build recorded in the
+    manifest are left untouched. With multiple jobs, companies are generated
+    in a process pool.
+    """
     target = WEBSITE_DIR / "database"
-    shutil.copytree(DATABASE_DIR, target)
-
-    # Turn all YAML files into JSON
-    for yaml_file in target.rglob("*.yaml"):
-        json_file = yaml_file.with_suffix(".json")
-        json_file.write_text(
-            json.dumps(
-                yaml.safe_load(yaml_file.read_text()),
-                indent=2,
-            ),
-        )
-        yaml_file.unlink()
+    target.mkdir(exist_ok=True)
+
+    # A company linked to multiple integrations is indexed multiple times.
+    ha_companies: dict[str, HACompany] = {}
+    for company in index.companies.values():
+        ha_companies.setdefault(company.id, company)
+
+    company_dirs = list(DATABASE_DIR.iterdir())
+    company_ids = {company_dir.name for company_dir in company_dirs}
+
+    if jobs > 1:
+        company_manifests = manifest.by_company()
+        with ProcessPoolExecutor(jobs) as executor:
+            for entries, cache_entries in executor.map(
+                _generate_company_job,
+                company_dirs,
+                [ha_companies.get(company_dir.name) for company_dir in company_dirs],
+                [target / company_dir.name for company_dir in company_dirs],
+                [
+                    company_manifests.get(company_dir.name)
+                    or BuildManifest(manifest.path)
+                    for company_dir in company_dirs
+                ],
+                [assets] * len(company_dirs),
+                [json_format] * len(company_dirs),
+                chunksize=max(1, len(company_dirs) // (jobs * 4)),
+            ):
+                manifest.current.update(entries)
+                DATABASE_CACHE.merge(cache_entries)
+    else:
+        for company_dir in company_dirs:
+            generate_company(
+                company_dir,
+                ha_companies.get(company_dir.name),
+                target / company_dir.name,
+                manifest,
+                assets,
+                json_format,
+            )
+
+    # Remove companies that no longer exist
+    for company_target in target.iterdir():
+        if company_target.name not in company_ids:
+            shutil.rmtree(company_target)
 
     index_file = {
         "works_with_ha": f"{BASE_URL}/works_with_ha/index.json",
+        "lookup": f"{BASE_URL}/lookup/index.json",
         "companies": {},
     }
 
-    for company in index.companies.values():
+    for company in ha_companies.values():
         company_url = f"{BASE_URL}/database/{company.id}"
         index_file["companies"][company.id] = {
             "name": company.name,
             "url": f"{company_url}/info.json",
         }
-        migrate_company(company, company_url, target / company.id)
 
-    (WEBSITE_DIR / "index.json").write_text(
-        json.dumps(index_file, indent=2),
-    )
+    write_json(WEBSITE_DIR / "index.json", index_file, json_format, if_changed=True)
 
 
-def migrate_company(company: Device, url_prefix: str, target: pathlib.Path) -> None:
-    """Migrate a company."""
-    devices = {}
-    for device in company.company.devices:
-        device_url = f"{url_prefix}/devices/{device.id}"
-        devices[device.id] = {
-            "model_name": device.model_name,
-            "url": f"{device_url}/info.json",
-        }
-        migrate_device(
-            device,
-            device_url,
-            target / "devices" / device.id,
+def generate_company(
+    company_dir: pathlib.Path,
+    ha_company: HACompany | None,
+    target: pathlib.Path,
+    manifest: BuildManifest,
+    assets: str = "copy",
+    json_format: JSONFormat = JSONFormat(),
+) -> None:
+    """Generate the output of a company and its devices if they changed.
+
+    Only companies linked to Home Assistant are migrated, the files of
+    other companies are converted to JSON as-is.
+    """
+    company_url = f"{BASE_URL}/database/{company_dir.name}"
+    # Migrated output depends on the base URL
+    variant = company_url if ha_company else ""
+    variant = f"{variant}|{json_format.variant}"
+
+    device_digests = []
+    device_ids = set()
+    for device_dir in sorted((company_dir / "devices").iterdir()):
+        device_ids.add(device_dir.name)
+        device_target = target / "devices" / device_dir.name
+        source = hash_files(device_dir, [device_dir])
+        device_digests.append(f"{device_dir.name}:{source}")
+        digest = hash_values(variant, source)
+
+        if manifest.is_current(
+            f"{company_dir.name}/devices/{device_dir.name}", digest, device_target
+        ):
+            continue
+
+        shutil.rmtree(device_target, ignore_errors=True)
+        emit_files(
+            device_dir,
+            list(device_dir.rglob("*")),
+            device_target,
+            assets,
+            json_format,
+            markdown_url=(
+                f"{company_url}/devices/{device_dir.name}" if ha_company else None
+            ),
         )
 
-    # Update info.json with extra info
-    index_file = target / "info.json"
-    index = json.loads(index_file.read_text())
-    index["devices"] = devices
-    index_file.write_text(
-        json.dumps(index, indent=2),
+    # Remove devices that no longer exist
+    if (target / "devices").exists():
+        for device_target in (target / "devices").iterdir():
+            if device_target.name not in device_ids:
+                shutil.rmtree(device_target)
+
+    # The company info lists all devices, so it changes with any device.
+    company_files = [path for path in company_dir.iterdir() if path.name != "devices"]
+    source = hash_files(company_dir, company_files, *device_digests)
+    manifest.current[source_key(company_dir.name)] = source
+    digest = hash_values(variant, source)
+    if manifest.is_current(company_dir.name, digest, target / "info.json"):
+        return
+
+    target.mkdir(exist_ok=True)
+    for path in target.iterdir():
+        if path.name == "devices":
+            continue
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+    extra = None
+    if ha_company:
+        extra = {"devices": company_devices(ha_company, company_url)}
+
+    emit_files(
+        company_dir,
+        [
+            file
+            for path in company_files
+            for file in (path.rglob("*") if path.is_dir() else [path])
+        ],
+        target,
+        assets,
+        json_format,
+        extra=extra,
     )
+    (target / "devices").mkdir(exist_ok=True)
+
+
+def _generate_company_job(
+    company_dir: pathlib.Path,
+    ha_company: HACompany | None,
+    target: pathlib.Path,
+    manifest: BuildManifest,
+    assets: str,
+    json_format: JSONFormat,
+) -> tuple[dict[str, str], dict]:
+    """Generate a company in a worker process.
+
+    Returns its manifest entries with the files parsed by the worker, which
+    are added to the cache of the main process.
+    """
+    generate_company(company_dir, ha_company, target, manifest, assets, json_format)
+    return manifest.current, DATABASE_CACHE.take_updated()
 
 
-def migrate_device(device: Device, url_prefix: str, target: pathlib.Path) -> None:
-    """Migrate a device."""
+def emit_files(
+    source: pathlib.Path,
+    paths: list[pathlib.Path],
+    target: pathlib.Path,
+    assets: str = "copy",
+    json_format: JSONFormat = JSONFormat(),
+    markdown_url: str | None = None,
+    extra: dict | None = None,
+) -> None:
+    """Emit the output of source files in a single pass.
+
+    YAML files are converted to JSON, other files are materialized with the
+    assets mode (see materialize). The data is
+    read through the database cache, which already holds the files parsed
+    when loading the index. Extra keys are merged into info.json.
+
+    With a markdown URL, images in markdown files are prefixed with it and
+    the files are listed in info.json.
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    yaml_files = []
     markdown_files = {}
 
-    # Process all markdown files
-    for md_file in target.rglob("*.md"):
-        content = md_file.read_text().strip()
-        if not content:
+    for path in paths:
+        if path.is_dir():
             continue
-        md_file.write_text(
-            prefix_images(
-                content,
-                f"{url_prefix}/",
-            ),
-        )
-        markdown_files[md_file.name] = f"{url_prefix}/{md_file.name}"
-
-    # Update info with extra info
-    index_file = target / "info.json"
-    index = json.loads(index_file.read_text())
-    index["markdown_files"] = markdown_files
-    index_file.write_text(
-        json.dumps(index, indent=2),
-    )
+        if path.suffix == ".yaml":
+            yaml_files.append(path)
+            continue
+
+        path_target = target / path.relative_to(source)
+        path_target.parent.mkdir(parents=True, exist_ok=True)
+
+        if markdown_url is not None and path.suffix == ".md":
+            content = path.read_text().strip()
+            if content:
+                path_target.write_text(prefix_images(content, f"{markdown_url}/"))
+                markdown_files[path.name] = f"{markdown_url}/{path.name}"
+                continue
+
+        materialize(path, path_target, assets)
+
+    if markdown_url is not None:
+        extra = {**(extra or {}), "markdown_files": markdown_files}
+
+    for path in yaml_files:
+        relative_path = path.relative_to(source)
+        data = load_yaml(path)
+        if extra and relative_path == INFO_FILE:
+            data.update(extra)
+        json_file = (target / relative_path).with_suffix(".json")
+        json_file.parent.mkdir(parents=True, exist_ok=True)
+        write_json(json_file, data, json_format)
+
+
+def company_devices(company: HACompany, url_prefix: str) -> dict[str, dict]:
+    """Return the devices listed in the company info."""
+    devices = {}
+    for device in company.company.devices:
+        device_url = f"{url_prefix}/devices/{device.id}"
+        devices[device.id] = {
+            "model_name": device.model_name,
+            "url": f"{device_url}/info.json",
+        }
+    return devices
@@ -0,0 +1,61 @@
+"""Generate lookup files to find devices by their Home Assistant key."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from ...models.home_assistant import HADeviceIndex
+from ..const import BASE_URL, WEBSITE_DIR
+from ..files import JSONFormat, remove_stale_json, write_json
+
+TARGET = WEBSITE_DIR / "lookup"
+
+
+def generate_lookup(
+    index: HADeviceIndex, json_format: JSONFormat = JSONFormat()
+) -> None:
+    """Generate a lookup file per integration.
+
+    Each file maps manufacturer and model ID, as reported by Home Assistant,
+    to a summary of the device.
+    """
+    TARGET.mkdir(exist_ok=True)
+
+    # integration => manufacturer => model_id => device
+    lookups: dict[str, dict[str, dict[str, dict]]] = defaultdict(
+        lambda: defaultdict(dict)
+    )
+
+    # A company linked to multiple integrations is indexed multiple times.
+    companies = {company.id: company for company in index.companies.values()}
+
+    for company in companies.values():
+        for (integration, manufacturer, model_id), device in company.devices.items():
+            lookups[integration][manufacturer].setdefault(
+                model_id,
+                {
+                    "company_id": company.id,
+                    "device_id": device.id,
+                    "model_name": device.model_name,
+                    "is_works_with_ha": device.ha_info["is_works_with_ha"],
+                    "url": f"{BASE_URL}/database/{company.id}/devices/{device.id}/info.json",
+                },
+            )
+
+    outputs = {
+        "index.json": {
+            "integrations": {
+                integration: f"{BASE_URL}/lookup/{integration}.json"
+                for integration in sorted(lookups)
+            },
+        },
+    }
+
+    for integration, manufacturers in lookups.items():
+        outputs[f"{integration}.json"] = manufacturers
+
+    for name, content in outputs.items():
+        write_json(TARGET / name, content, json_format, if_changed=True)
+
+    # Remove integrations that no longer have devices
+    remove_stale_json(TARGET, outputs)
@@ -0,0 +1,210 @@
+"""Generate a SQLite database of all devices."""
+
+from __future__ import annotations
+
+import sqlite3
+
+from ...models.home_assistant import HACompany, HADeviceIndex
+from ..const import WEBSITE_DIR
+from ..manifest import BuildManifest, source_key
+
+TARGET = WEBSITE_DIR / "devices.sqlite"
+
+# Bump when the schema changes, the database is then created again.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE sources (
+    company_id TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+CREATE TABLE companies (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE company_integrations (
+    company_id TEXT NOT NULL REFERENCES companies (id),
+    integration TEXT NOT NULL,
+    manufacturer TEXT NOT NULL
+);
+CREATE TABLE devices (
+    company_id TEXT NOT NULL REFERENCES companies (id),
+    id TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    model_name TEXT,
+    has_configuration_url INTEGER,
+    has_suggested_area INTEGER,
+    PRIMARY KEY (company_id, id)
+);
+CREATE TABLE integrations (
+    company_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    integration TEXT NOT NULL,
+    manufacturer TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    FOREIGN KEY (company_id, device_id) REFERENCES devices (company_id, id)
+);
+CREATE TABLE versions (
+    company_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    software TEXT,
+    hardware TEXT,
+    FOREIGN KEY (company_id, device_id) REFERENCES devices (company_id, id)
+);
+CREATE TABLE badges (
+    company_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    integration TEXT NOT NULL,
+    badge TEXT NOT NULL,
+    FOREIGN KEY (company_id, device_id) REFERENCES devices (company_id, id)
+);
+CREATE INDEX company_integrations_key
+    ON company_integrations (integration, manufacturer);
+CREATE INDEX devices_model_id ON devices (model_id);
+CREATE INDEX integrations_key ON integrations (integration, manufacturer, model_id);
+CREATE INDEX integrations_device ON integrations (company_id, device_id);
+CREATE INDEX versions_software ON versions (software);
+CREATE INDEX versions_hardware ON versions (hardware);
+CREATE INDEX versions_device ON versions (company_id, device_id);
+CREATE INDEX badges_integration ON badges (integration, badge);
+CREATE INDEX badges_device ON badges (company_id, device_id);
+"""
+
+# Tables with rows of a company
+COMPANY_TABLES = {
+    "companies": "id",
+    "company_integrations": "company_id",
+    "devices": "company_id",
+    "integrations": "company_id",
+    "versions": "company_id",
+    "badges": "company_id",
+}
+
+
+def generate_sqlite(index: HADeviceIndex, manifest: BuildManifest) -> None:
+    """Generate a SQLite database of all companies and devices.
+
+    An existing database is updated: only the rows of companies whose files
+    changed since they were exported are replaced. Changes are detected with
+    the source digests that the JSON output recorded in the manifest.
+    """
+    conn = connect()
+    try:
+        with conn:
+            updated = update_companies(conn, index, manifest)
+    finally:
+        conn.close()
+
+    print(f"Exported {updated} companies to {TARGET.name}")
+
+
+def connect() -> sqlite3.Connection:
+    """Connect to the database, creating it if it has an older schema."""
+    conn = sqlite3.connect(TARGET)
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return conn
+
+    conn.close()
+    TARGET.unlink(missing_ok=True)
+    conn = sqlite3.connect(TARGET)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def update_companies(
+    conn: sqlite3.Connection, index: HADeviceIndex, manifest: BuildManifest
+) -> int:
+    """Replace the rows of changed companies. Return how many were updated."""
+    exported = dict(conn.execute("SELECT company_id, digest FROM sources"))
+    companies = {company.id: company for company in index.all_companies}
+
+    updated = 0
+    for company_id, company in companies.items():
+        digest = manifest.current[source_key(company_id)]
+        if exported.get(company_id) == digest:
+            continue
+        delete_company(conn, company_id)
+        insert_company(conn, company)
+        conn.execute(
+            "INSERT INTO sources (company_id, digest) VALUES (?, ?)",
+            (company_id, digest),
+        )
+        updated += 1
+
+    for company_id in exported.keys() - companies.keys():
+        delete_company(conn, company_id)
+
+    return updated
+
+
+def delete_company(conn: sqlite3.Connection, company_id: str) -> None:
+    """Delete the rows of a company."""
+    for table, column in COMPANY_TABLES.items():
+        conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (company_id,))
+    conn.execute("DELETE FROM sources WHERE company_id = ?", (company_id,))
+
+
+def insert_company(conn: sqlite3.Connection, company: HACompany) -> None:
+    """Insert the rows of a company."""
+    conn.execute(
+        "INSERT INTO companies (id, name) VALUES (?, ?)", (company.id, company.name)
+    )
+    conn.executemany(
+        "INSERT INTO company_integrations (company_id, integration, manufacturer) "
+        "VALUES (?, ?, ?)",
+        [
+            (company.id, integration["integration"], integration["manufacturer"])
+            for integration in company.ha_info["integrations"]
+        ],
+    )
+
+    conn.executemany(
+        "INSERT INTO devices (company_id, id, model_id, model_name) VALUES (?, ?, ?, ?)",
+        [
+            (company.id, device.id, device.model_id, device.model_name)
+            for device in company.devices_no_ha_data
+        ],
+    )
+
+    for device in company.ha_devices:
+        conn.execute(
+            "INSERT INTO devices (company_id, id, model_id, model_name, "
+            "has_configuration_url, has_suggested_area) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                company.id,
+                device.id,
+                device.device.model_id,
+                device.model_name,
+                device.ha_info.get("has_configuration_url"),
+                device.ha_info.get("has_suggested_area"),
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO integrations (company_id, device_id, integration, "
+            "manufacturer, model_id) VALUES (?, ?, ?, ?, ?)",
+            [(company.id, device.id, *key) for key in device.keys],
+        )
+        conn.executemany(
+            "INSERT INTO versions (company_id, device_id, software, hardware) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    company.id,
+                    device.id,
+                    version.get("software"),
+                    version.get("hardware"),
+                )
+                for version in device.ha_versions["versions"]
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO badges (company_id, device_id, integration, badge) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (company.id, device.id, integration, badge)
+                for integration, badge in (
+                    device.ha_info["is_works_with_ha"] or {}
+                ).items()
+            ],
+        )
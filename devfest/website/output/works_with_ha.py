@@ -1,17 +1,19 @@
 """Generate Works with HA data."""
 
-import json
 from collections import defaultdict
 
 from ...models.home_assistant import HADeviceIndex
 from ..const import WEBSITE_DIR
+from ..files import JSONFormat, remove_stale_json, write_json
 
 TARGET = WEBSITE_DIR / "works_with_ha"
 
 
-def generate_works_with_ha(index: HADeviceIndex) -> None:
+def generate_works_with_ha(
+    index: HADeviceIndex, json_format: JSONFormat = JSONFormat()
+) -> None:
     """Generate works with HA files."""
-    TARGET.mkdir()
+    TARGET.mkdir(exist_ok=True)
 
     # domain => ha devices
     ha_device_mappings: dict[str, list] = defaultdict(list)
@@ -52,30 +54,20 @@ def generate_works_with_ha(index: HADeviceIndex) -> None:
                         }
                     )
 
-    index_file = TARGET / "index.json"
-    index_file.write_text(
-        json.dumps(
-            {
-                "integrations": sorted(ha_device_mappings),
-            },
-            indent=2,
-        )
-    )
-
-    all_file = TARGET / "all.json"
-    all_file.write_text(
-        json.dumps(
-            all_works_with,
-            indent=2,
-        )
-    )
+    outputs = {
+        "index.json": {
+            "integrations": sorted(ha_device_mappings),
+        },
+        "all.json": all_works_with,
+    }
 
     for integration, devices in ha_device_mappings.items():
-        with open(TARGET / f"{integration}.json", "w") as fp:
-            json.dump(
-                {
-                    "devices": devices,
-                },
-                fp,
-                indent=2,
-            )
+        outputs[f"{integration}.json"] = {
+            "devices": devices,
+        }
+
+    for name, content in outputs.items():
+        write_json(TARGET / name, content, json_format, if_changed=True)
+
+    # Remove integrations that no longer have devices
+    remove_stale_json(TARGET, outputs)
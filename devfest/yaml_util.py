@@ -0,0 +1,63 @@
+"""YAML helpers.
+
+All YAML in the database is read and written through these helpers. They
+use the libyaml based loader and dumper when PyYAML was built with it.
+"""
+
+from __future__ import annotations
+
+import pathlib
+from typing import Any
+
+import yaml
+
+from .file_util import write_text_atomic
+
+try:
+    from yaml import CSafeDumper as FastDumper
+    from yaml import CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeDumper as FastDumper
+    from yaml import SafeLoader as Loader
+
+
+def parse_yaml(text: str) -> Any:
+    """Parse a YAML string."""
+    return yaml.load(text, Loader=Loader)
+
+
+def load_yaml(path: pathlib.Path) -> Any:
+    """Load a YAML file."""
+    return parse_yaml(path.read_text())
+
+
+def dump_yaml(data: Any) -> str:
+    """Serialize data to a YAML string."""
+    # libyaml wraps long escaped strings differently than PyYAML. Strings are
+    # only escaped when they are not printable ASCII, so those are dumped
+    # with PyYAML to keep the output identical.
+    dumper = FastDumper if _is_printable_ascii(data) else yaml.SafeDumper
+    return yaml.dump(data, Dumper=dumper)
+
+
+def write_yaml(path: pathlib.Path, data: Any) -> None:
+    """Write data to a YAML file.
+
+    The data is written to a temporary file that replaces the file, so an
+    interrupted write never leaves a partial file behind.
+    """
+    write_text_atomic(path, dump_yaml(data))
+
+
+def _is_printable_ascii(data: Any) -> bool:
+    """Return if all strings in data are printable ASCII."""
+    if isinstance(data, str):
+        return data.isascii() and data.isprintable()
+    if isinstance(data, dict):
+        return all(
+            _is_printable_ascii(key) and _is_printable_ascii(value)
+            for key, value in data.items()
+        )
+    if isinstance(data, list):
+        return all(_is_printable_ascii(value) for value in data)
+    return True
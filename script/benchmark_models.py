@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Benchmark the memory used by loaded device records.
+
+Compares the slot based models with the dataclass layout they replaced,
+using synthetic records shaped like the YAML files in the database.
+
+    python3 script/benchmark_models.py [number of devices]
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import pathlib
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from devfest.const import DATABASE_DIR  # noqa: E402
+from devfest.models.base import Company, Device  # noqa: E402
+from devfest.models.cache import intern_strings  # noqa: E402
+from devfest.models.home_assistant import HACompany, HADevice  # noqa: E402
+
+DEVICES_PER_COMPANY = 20
+INTEGRATIONS = ["zha", "zwave_js", "matter", "hue", "shelly", "tuya"]
+
+
+@dataclasses.dataclass
+class LegacyDevice:
+    path: pathlib.Path
+    info: dict
+    subdirs: list[str]
+    is_new: bool = False
+
+
+@dataclasses.dataclass
+class LegacyHADevice:
+    device: LegacyDevice
+    ha_info: dict
+    ha_versions: dict
+
+
+@dataclasses.dataclass
+class LegacyCompany:
+    path: pathlib.Path
+    info: dict
+    subdirs: list[str]
+    devices: list[LegacyDevice]
+    is_new: bool = False
+
+
+@dataclasses.dataclass
+class LegacyHACompany:
+    company: LegacyCompany
+    ha_info: dict
+    devices: dict
+
+
+def parse(data: dict) -> dict:
+    """Return a copy with fresh strings, like parsing a file does."""
+    return json.loads(json.dumps(data))
+
+
+def device_files(company: int, device: int) -> tuple[dict, dict, dict]:
+    """Return info, HA info and HA versions of a synthetic device."""
+    integration = INTEGRATIONS[company % len(INTEGRATIONS)]
+    model_id = f"MODEL-{company}-{device}"
+    return (
+        parse({"model_id": model_id, "model_name": f"Model {company} {device}"}),
+        parse(
+            {
+                "integrations": [
+                    {
+                        "integration": integration,
+                        "manufacturer": f"Manufacturer {company}",
+                        "model_id": model_id,
+                    }
+                ],
+                "has_configuration_url": False,
+                "has_suggested_area": True,
+                "is_works_with_ha": None,
+            }
+        ),
+        parse({"versions": [{"software": f"1.{version}"} for version in range(3)]}),
+    )
+
+
+def build_legacy(companies: int) -> list:
+    """Build records with the dataclass layout."""
+    result = []
+    for company_index in range(companies):
+        company_id = f"company-{company_index}"
+        company_path = DATABASE_DIR / company_id
+        devices = []
+        ha_devices = {}
+        for device_index in range(DEVICES_PER_COMPANY):
+            info, ha_info, ha_versions = device_files(company_index, device_index)
+            device = LegacyDevice(
+                company_path / "devices" / f"model-{device_index}",
+                info,
+                ["home-assistant"],
+            )
+            devices.append(device)
+            ha_device = LegacyHADevice(device, ha_info, ha_versions)
+            for integration in ha_info["integrations"]:
+                key = (
+                    integration["integration"],
+                    integration["manufacturer"],
+                    integration["model_id"],
+                )
+                ha_devices[key] = ha_device
+        company = LegacyCompany(
+            company_path,
+            parse({"name": f"Company {company_index}"}),
+            ["devices", "home-assistant"],
+            devices,
+        )
+        result.append(
+            LegacyHACompany(
+                company,
+                parse({"integrations": []}),
+                ha_devices,
+            )
+        )
+    return result
+
+
+def build_slots(companies: int) -> list:
+    """Build records with the slot based models."""
+    result = []
+    for company_index in range(companies):
+        company = Company(
+            f"company-{company_index}",
+            info=intern_strings(parse({"name": f"Company {company_index}"})),
+            is_new=False,
+        )
+        company._subdirs = frozenset({"devices", "home-assistant"})
+        company._devices = []
+        ha_company = HACompany(company)
+        ha_company._ha_info = intern_strings(parse({"integrations": []}))
+        ha_company._ha_devices = []
+        for device_index in range(DEVICES_PER_COMPANY):
+            info, ha_info, ha_versions = device_files(company_index, device_index)
+            device = Device(
+                company.id,
+                f"model-{device_index}",
+                info=intern_strings(info),
+                is_new=False,
+            )
+            device._subdirs = frozenset({"home-assistant"})
+            company._devices.append(device)
+            ha_device = HADevice(device)
+            ha_device._ha_info = intern_strings(ha_info)
+            ha_device._ha_versions = intern_strings(ha_versions)
+            ha_company._ha_devices.append(ha_device)
+        # Build the index
+        ha_company.devices
+        result.append(ha_company)
+    return result
+
+
+def measure(build, companies: int) -> int:
+    """Return the bytes allocated by the records."""
+    tracemalloc.start()
+    records = build(companies)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main() -> None:
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    companies = max(1, devices // DEVICES_PER_COMPANY)
+    devices = companies * DEVICES_PER_COMPANY
+
+    legacy = measure(build_legacy, companies)
+    slots = measure(build_slots, companies)
+
+    print(f"{devices} devices in {companies} companies")
+    print(f"dataclasses: {legacy / 2**20:8.1f} MiB ({legacy / devices:6.0f} B/device)")
+    print(f"slots:       {slots / 2**20:8.1f} MiB ({slots / devices:6.0f} B/device)")
+    print(f"reduction:   {(1 - slots / legacy) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Tests for the duplicate company detection."""
+
+from __future__ import annotations
+
+import random
+import string
+import time
+import unittest
+
+from devfest.duplicates import find_duplicates, group_duplicates, normalize_name
+
+
+def random_names(count: int) -> dict[str, str]:
+    """Return random company names keyed by ID."""
+    rng = random.Random(1)
+    names = {}
+    for index in range(count):
+        name = "".join(
+            rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))
+        )
+        suffix = rng.choice(["", " Inc", " GmbH", " Electronics"])
+        names[f"company-{index}"] = f"{name.title()}{suffix}"
+    return names
+
+
+class DuplicatesTest(unittest.TestCase):
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Samsung Electronics"), "samsung")
+        self.assertEqual(
+            normalize_name("Signify Netherlands B.V."), "signify netherlands"
+        )
+        self.assertEqual(normalize_name("TP-Link Technologies Co., Ltd."), "tp link")
+
+    def test_find_duplicates(self):
+        names = {
+            "samsung": "Samsung",
+            "samsung-electronics": "Samsung Electronics",
+            "shelly": "Shelly",
+        }
+        self.assertEqual(
+            find_duplicates(names), [("samsung", "samsung-electronics", 1.0)]
+        )
+        self.assertEqual(
+            group_duplicates(find_duplicates(names)),
+            [["samsung", "samsung-electronics"]],
+        )
+
+    def test_find_duplicates_at_scale(self):
+        """Common trigrams must not lower the similarity of duplicates."""
+        names = random_names(30000)
+        names["samsung"] = "Samsung"
+        names["samsung-electronics"] = "Samsung Electronics"
+        names["acme"] = "Acme Widgets"
+        names["acme-inc"] = "ACME Widgets Inc."
+
+        start = time.monotonic()
+        found = {
+            (first, second): similarity
+            for first, second, similarity in find_duplicates(names)
+        }
+        self.assertLess(time.monotonic() - start, 30)
+
+        self.assertEqual(found[("samsung", "samsung-electronics")], 1.0)
+        self.assertEqual(found[("acme", "acme-inc")], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()